@@ -0,0 +1,66 @@
+import argparse
+import os
+import timeit
+
+import django
+
+# Set up Django
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "orm_skeleton.settings")
+django.setup()
+
+from django.db import transaction
+
+from main_app.custom_model_manager import _director_search
+from main_app.models import Director
+
+SHAPES = {
+    'name': {'name': 'smith'},
+    'nationality': {'nationality': 'brit'},
+    'both': {'name': 'smith', 'nationality': 'brit'},
+}
+
+
+def compile_only(values):
+    # What get_directors() used to pay on every call before touching the database.
+    return _director_search(Director.objects, **values).query.get_compiler(Director.objects.db).as_sql()
+
+
+def orm_search(values):
+    return list(_director_search(Director.objects, **values))
+
+
+def prepared_search(values):
+    return Director.objects.search(**values)
+
+
+def best_of(function, values, number, repeat):
+    return min(timeit.repeat(lambda: function(values), number=number, repeat=repeat)) / number * 1_000_000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares get_directors searches compiled on every call '
+                                                 'with the cached, prepared ones.')
+    parser.add_argument('--directors', type=int, default=1000, help='Temporary directors to search through.')
+    parser.add_argument('--number', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        Director.objects.bulk_create([
+            Director(full_name=f'Director {i} {"Smith" if i % 10 == 0 else "Jones"}',
+                     nationality='British' if i % 3 == 0 else 'French')
+            for i in range(args.directors)
+        ])
+
+        print(f'{"shape":<12}{"compile us":>12}{"orm us":>12}{"prepared us":>14}{"saved":>8}')
+        for shape, values in SHAPES.items():
+            prepared_search(values)
+
+            compile_us = best_of(compile_only, values, args.number, args.repeat)
+            orm_us = best_of(orm_search, values, args.number, args.repeat)
+            prepared_us = best_of(prepared_search, values, args.number, args.repeat)
+
+            print(f'{shape:<12}{compile_us:>12.1f}{orm_us:>12.1f}{prepared_us:>14.1f}'
+                  f'{(1 - prepared_us / orm_us) * 100:>7.0f}%')
+
+        transaction.set_rollback(True)
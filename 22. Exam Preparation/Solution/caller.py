@@ -1,4 +1,6 @@
 import os
+from decimal import Decimal
+
 import django
 
 # Set up Django
@@ -6,7 +8,8 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "orm_skeleton.settings")
 django.setup()
 
 # Import your models here
-from django.db.models import Q, Count, Avg, F
+from django.db.models import F, OuterRef, Subquery
+from main_app.db_functions import GroupConcat
 from main_app.models import Movie, Director, Actor
 
 
@@ -17,18 +20,7 @@ def get_directors(search_name=None, search_nationality=None):
     if search_name is None and search_nationality is None:
         return ""
 
-    query = Q()
-    query_name = Q(full_name__icontains=search_name)
-    query_nationality = Q(nationality__icontains=search_nationality)
-
-    if search_name is not None and search_nationality is not None:
-        query |= query_name & query_nationality
-    elif search_name is not None:
-        query |= query_name
-    else:
-        query |= query_nationality
-
-    directors = Director.objects.filter(query).order_by('full_name')
+    directors = Director.objects.search(search_name, search_nationality)
 
     if not directors:
         return ""
@@ -51,32 +43,37 @@ def get_top_director():
 
 
 def get_top_actor():
-    actor = Actor.objects.prefetch_related('starring_movies') \
-        .annotate(
-        num_of_movies=Count('starring_movies'),
-        movies_avg_rating=Avg('starring_movies__rating')) \
-        .order_by('-num_of_movies', 'full_name') \
+    starring_titles = Movie.objects \
+        .filter(starring_actor=OuterRef('pk')) \
+        .values('starring_actor') \
+        .annotate(titles=GroupConcat('title')) \
+        .values('titles')
+
+    actor = Actor.objects \
+        .filter(starring_count__gt=0) \
+        .annotate(movies=Subquery(starring_titles)) \
+        .order_by('-starring_count', 'full_name') \
+        .only('full_name', 'starring_count', 'starring_rating_sum') \
         .first()
 
-    if not actor or not actor.num_of_movies:
+    if not actor:
         return ""
 
-    movies = ", ".join(movie.title for movie in actor.starring_movies.all() if movie)
+    movies_avg_rating = actor.starring_rating_sum / actor.starring_count
 
-    return f"Top Actor: {actor.full_name}, starring in movies: {movies}, " \
-           f"movies average rating: {actor.movies_avg_rating:.1f}"
+    return f"Top Actor: {actor.full_name}, starring in movies: {actor.movies}, " \
+           f"movies average rating: {movies_avg_rating:.1f}"
 
 
 def get_actors_by_movies_count():
-    actors = Actor.objects.annotate(num_movies=Count('actor__movies')) \
-                 .order_by('-num_movies', 'full_name')[:3]
+    actors = Actor.objects.order_by('-cast_count', 'full_name')[:3]
 
-    if not actors or not actors[0].num_movies:
+    if not actors or not actors[0].cast_count:
         return ""
 
     result = []
     for actor in actors:
-        result.append(f"{actor.full_name}, participated in {actor.num_movies} movies")
+        result.append(f"{actor.full_name}, participated in {actor.cast_count} movies")
 
     return '\n'.join(result)
 
@@ -84,7 +81,7 @@ def get_actors_by_movies_count():
 def get_top_rated_awarded_movie():
     top_movie = Movie.objects\
         .select_related('starring_actor')\
-        .prefetch_related('actors') \
+        .prefetch_cast() \
         .filter(is_awarded=True) \
         .order_by('-rating', 'title') \
         .first()
@@ -94,20 +91,22 @@ def get_top_rated_awarded_movie():
 
     starring_actor = top_movie.starring_actor.full_name if top_movie.starring_actor else "N/A"
 
-    participating_actors = top_movie.actors.order_by('full_name').values_list('full_name', flat=True)
-    cast = ", ".join(participating_actors)
+    cast = ", ".join(top_movie.cast_names)
 
     return f"Top rated awarded movie: {top_movie.title}, rating: {top_movie.rating:.1f}. " \
            f"Starring actor: {starring_actor}. Cast: {cast}."
 
 
 def increase_rating():
-    updated_movies = Movie.objects.filter(is_classic=True, rating__lt=10.0)
+    num_of_updated_movies = Movie.objects \
+        .filter(is_classic=True, rating__lt=10.0) \
+        .clamped_update('rating', F('rating') + Decimal('0.1'))
 
-    if not updated_movies:
+    if not num_of_updated_movies:
         return "No ratings increased."
 
-    num_of_updated_movies = updated_movies.update(rating=F('rating') + 0.1)
+    # update() bypasses the signal handlers, so refresh the starring rating sums it changed.
+    Actor.objects.rebuild_counters(Movie.objects.filter(is_classic=True).values('starring_actor'))
 
     return f"Rating increased for {num_of_updated_movies} movies."
 
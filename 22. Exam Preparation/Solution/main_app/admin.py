@@ -24,6 +24,7 @@ class ActorAdmin(admin.ModelAdmin):
 @admin.register(Movie)
 class MovieAdmin(admin.ModelAdmin):
     list_display = ('title', 'storyline', 'rating', 'director')
+    list_select_related = ('director',)
     list_filter = ('is_awarded', 'is_classic', 'genre')
     search_fields = ('title', 'director__full_name',)
     search_help_text = "Search by movie's title or director's full name"
@@ -1,6 +1,159 @@
-from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Prefetch, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
 
+from main_app.db_functions import GroupConcat
+from main_app.model_mixins import LastUpdatedQuerySet
+from main_app.prepared_queries import PreparedQuery
+
+# Joins the names aggregated by MovieQuerySet.with_cast(); a control character no name contains.
+CAST_SEPARATOR = '\x1f'
+
+
+class CounterManager(models.Manager):
+    def adjust(self, pks, **deltas) -> int:
+        pks = [pk for pk in pks if pk is not None]
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not pks or not deltas:
+            return 0
+
+        return self.filter(pk__in=pks).update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+    def _counted(self, pks):
+        return self.all() if pks is None else self.filter(pk__in=pks)
+
+
+def _director_search(manager, name=None, nationality=None):
+    query = Q()
+    if name is not None:
+        query &= Q(full_name__icontains=name)
+    if nationality is not None:
+        query &= Q(nationality__icontains=nationality)
+
+    return manager.filter(query).order_by('full_name')
+
+
+class DirectorManager(CounterManager):
+    search_query = PreparedQuery(_director_search)
+
+    def search(self, name=None, nationality=None):
+        return self.search_query.execute(self, name=name, nationality=nationality)
 
-class DirectorManager(models.Manager):
     def get_directors_by_movies_count(self):
-        return self.annotate(num_movies=models.Count('director_movies')).order_by('-num_movies', 'full_name')
+        return self.annotate(num_movies=F('movie_count')).order_by('-movie_count', 'full_name')
+
+    def rebuild_counters(self, pks=None) -> int:
+        from main_app.models import Movie
+
+        movies = Movie.objects.filter(director=OuterRef('pk')).values('director')
+
+        return self._counted(pks).update(
+            movie_count=Coalesce(Subquery(movies.annotate(num=Count('pk')).values('num')), 0),
+        )
+
+
+class ActorManager(CounterManager.from_queryset(LastUpdatedQuerySet)):
+    def rebuild_counters(self, pks=None) -> int:
+        from main_app.models import Movie
+
+        starring = Movie.objects.filter(starring_actor=OuterRef('pk')).values('starring_actor')
+        cast = Movie.actors.through.objects.filter(actor=OuterRef('pk')).values('actor')
+
+        return self._counted(pks).update(
+            starring_count=Coalesce(Subquery(starring.annotate(num=Count('pk')).values('num')), 0),
+            starring_rating_sum=Coalesce(Subquery(starring.annotate(total=Sum('rating')).values('total')), 0),
+            cast_count=Coalesce(Subquery(cast.annotate(num=Count('pk')).values('num')), 0),
+        )
+
+
+def clamp_to_validators(field, expression):
+    for validator in field.validators:
+        if not isinstance(validator, (MaxValueValidator, MinValueValidator)):
+            continue
+
+        limit = validator.limit_value() if callable(validator.limit_value) else validator.limit_value
+        bound = Least if isinstance(validator, MaxValueValidator) else Greatest
+        expression = bound(expression, Value(limit, output_field=field))
+
+    return expression
+
+
+class MovieQuerySet(LastUpdatedQuerySet):
+    def page_after(self, cursor=None, size: int = 20):
+        # Keyset pagination over (release_date, id): the cursor is the (release_date, pk) of
+        # the last movie of the previous page, so deep pages cost the same as the first one.
+        from main_app.models import Actor
+
+        movies = self \
+            .select_related('director', 'starring_actor') \
+            .prefetch_related(Prefetch('actors', queryset=Actor.objects.only('full_name').order_by('full_name'))) \
+            .defer('storyline') \
+            .order_by('release_date', 'pk')
+
+        if cursor is not None:
+            release_date, pk = cursor
+            movies = movies.filter(Q(release_date__gt=release_date) | Q(release_date=release_date, pk__gt=pk))
+
+        return movies[:size]
+
+    def prefetch_cast(self):
+        from main_app.models import Actor
+
+        return self.prefetch_related(Prefetch('actors', queryset=Actor.objects.order_by('full_name')))
+
+    def with_cast(self):
+        # One correlated GROUP_CONCAT per movie instead of a second query. STRING_AGG orders the names
+        # on PostgreSQL; elsewhere Movie.cast_names sorts them.
+        from main_app.models import Movie
+
+        names = Movie.actors.through.objects \
+            .filter(movie=OuterRef('pk')) \
+            .values('movie') \
+            .annotate(names=GroupConcat('actor__full_name', separator=CAST_SEPARATOR, ordering='actor__full_name')) \
+            .values('names')
+
+        return self.annotate(cast_list=Coalesce(Subquery(names), Value(''), output_field=models.TextField()))
+
+    def clamped_update(self, field_name: str, expression, batch_size: int = 10000) -> int:
+        # update() skips field validators, so the new value is clamped to their bounds in SQL.
+        # Rows are updated in primary key ranges to keep every transaction and its locks short.
+        value = clamp_to_validators(self.model._meta.get_field(field_name), expression)
+
+        # The bounds are read from the database that is written to, never from a lagging replica.
+        movies = self.using(self._db or router.db_for_write(self.model))
+        bounds = movies.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            return 0
+
+        updated = 0
+        for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+            with transaction.atomic(using=movies.db):
+                updated += movies.filter(pk__gte=start, pk__lt=start + batch_size).update(**{field_name: value})
+
+        return updated
+
+
+class GenreTopMovieManager(models.Manager):
+    def leaderboards(self) -> dict:
+        boards = {}
+        for entry in self.order_by('genre', 'rank'):
+            boards.setdefault(entry.genre, []).append(entry)
+
+        return boards
+
+    def refresh(self, concurrently: bool = True):
+        # The ranking query only exists in the database (migration 0006): as the materialized view
+        # itself on PostgreSQL, elsewhere as a plain view the table is refilled from in one transaction.
+        using = router.db_for_write(self.model)
+        connection = connections[using]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        ranked = connection.ops.quote_name(f'{self.model._meta.db_table}_ranked')
+
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'REFRESH MATERIALIZED VIEW {"CONCURRENTLY " if concurrently else ""}{table}')
+            else:
+                cursor.execute(f'DELETE FROM {table}')
+                cursor.execute(f'INSERT INTO {table} (movie_id, genre, rank, title, rating) '
+                               f'SELECT movie_id, genre, rank, title, rating FROM {ranked}')
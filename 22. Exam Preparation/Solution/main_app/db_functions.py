@@ -0,0 +1,42 @@
+from django.db import models
+from django.db.models.expressions import OrderByList
+
+
+class GroupConcat(models.Aggregate):
+    # GROUP_CONCAT on SQLite, STRING_AGG on PostgreSQL. Only STRING_AGG applies `ordering`:
+    # GROUP_CONCAT has no ORDER BY before SQLite 3.44, so its order is unspecified.
+    function = 'GROUP_CONCAT'
+    output_field = models.TextField()
+
+    def __init__(self, expression, separator=', ', ordering=None, **extra):
+        self.ordering = OrderByList(ordering) if ordering is not None else None
+        super().__init__(expression, models.Value(separator), **extra)
+
+    def resolve_expression(self, *args, **kwargs):
+        result = super().resolve_expression(*args, **kwargs)
+        if self.ordering is not None:
+            result.ordering = self.ordering.resolve_expression(*args, **kwargs)
+        return result
+
+    def get_source_expressions(self):
+        source_expressions = super().get_source_expressions()
+        if self.ordering is not None:
+            return source_expressions + [self.ordering]
+        return source_expressions
+
+    def set_source_expressions(self, exprs):
+        if self.ordering is not None:
+            *exprs, self.ordering = exprs
+        return super().set_source_expressions(exprs)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        ordering_sql, ordering_params = '', ()
+        if self.ordering is not None:
+            ordering_sql, ordering_params = compiler.compile(self.ordering)
+
+        sql, params = super().as_sql(
+            compiler, connection, function='STRING_AGG',
+            template='%(function)s(%(distinct)s%(expressions)s %(ordering)s)', ordering=ordering_sql,
+            **extra_context,
+        )
+        return sql, (*params, *ordering_params)
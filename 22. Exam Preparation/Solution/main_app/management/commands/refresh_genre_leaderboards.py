@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main_app.models import GenreTopMovie
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the top movies per genre behind GenreTopMovie.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocking', action='store_true',
+                            help='Refresh without CONCURRENTLY on PostgreSQL, locking out readers but running faster.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        GenreTopMovie.objects.refresh(concurrently=not options['blocking'])
+
+        self.stdout.write(f'Refreshed {GenreTopMovie.objects.count()} leaderboard rows '
+                          f'in {time.perf_counter() - started:.2f}s.')
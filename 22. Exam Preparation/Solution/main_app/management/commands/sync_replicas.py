@@ -0,0 +1,27 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from orm_skeleton.db_router import PRIMARY
+
+
+class Command(BaseCommand):
+    help = 'Copies the SQLite primary database into every replica file, standing in for replication locally.'
+
+    def handle(self, *args, **options):
+        primary = connections[PRIMARY]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Only SQLite replicas can be synced, PostgreSQL replicas use streaming replication.')
+
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replicas are configured, set REPLICA_DATABASES first.')
+
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            connections[alias].close()
+            with sqlite3.connect(connections[alias].settings_dict['NAME']) as replica:
+                primary.connection.backup(replica)
+
+            self.stdout.write(f'Synced {alias}.')
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:01
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Director = apps.get_model('main_app', 'Director')
+    Actor = apps.get_model('main_app', 'Actor')
+    Movie = apps.get_model('main_app', 'Movie')
+
+    movies = Movie.objects.filter(director=OuterRef('pk')).values('director')
+    Director.objects.update(
+        movie_count=Coalesce(Subquery(movies.annotate(num=Count('pk')).values('num')), 0),
+    )
+
+    starring = Movie.objects.filter(starring_actor=OuterRef('pk')).values('starring_actor')
+    cast = Movie.actors.through.objects.filter(actor=OuterRef('pk')).values('actor')
+    Actor.objects.update(
+        starring_count=Coalesce(Subquery(starring.annotate(num=Count('pk')).values('num')), 0),
+        starring_rating_sum=Coalesce(Subquery(starring.annotate(total=Sum('rating')).values('total')), 0),
+        cast_count=Coalesce(Subquery(cast.annotate(num=Count('pk')).values('num')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='actor',
+            name='cast_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='actor',
+            name='starring_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='actor',
+            name='starring_rating_sum',
+            field=models.DecimalField(decimal_places=1, default=0, editable=False, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='director',
+            name='movie_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='actor',
+            index=models.Index(fields=['-starring_count', 'full_name'], name='actor_starring_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='actor',
+            index=models.Index(fields=['-cast_count', 'full_name'], name='actor_cast_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='director',
+            index=models.Index(fields=['-movie_count', 'full_name'], name='director_movie_count_idx'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:03
+
+from django.db import IntegrityError, migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_people(apps, schema_editor):
+    # birth_date defaults to 1900-01-01, so people entered without one easily share it. Lists them
+    # instead of letting the constraints fail on the first pair, to be merged or given their real
+    # birth dates before migrating again.
+    duplicates = []
+    for model_name in ('Director', 'Actor'):
+        model = apps.get_model('main_app', model_name)
+        duplicates += [
+            f'{model_name} {full_name!r} born {birth_date} ({num} rows)'
+            for full_name, birth_date, num in model.objects
+                .using(schema_editor.connection.alias)
+                .values('full_name', 'birth_date')
+                .annotate(num=Count('pk'))
+                .filter(num__gt=1)
+                .order_by('full_name', 'birth_date')
+                .values_list('full_name', 'birth_date', 'num')
+        ]
+
+    if duplicates:
+        raise IntegrityError('People with the same full_name and birth_date must be resolved first:\n'
+                             + '\n'.join(duplicates))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0002_movie_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_people, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='actor',
+            constraint=models.UniqueConstraint(fields=('full_name', 'birth_date'), name='main_app_actor_unique_person'),
+        ),
+        migrations.AddConstraint(
+            model_name='director',
+            constraint=models.UniqueConstraint(fields=('full_name', 'birth_date'), name='main_app_director_unique_person'),
+        ),
+    ]
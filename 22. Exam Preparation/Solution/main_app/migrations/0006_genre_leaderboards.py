@@ -0,0 +1,68 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+RANKED_MOVIES = '''
+    SELECT movie_id, genre, rank, title, rating FROM (
+        SELECT id AS movie_id, genre, title, rating,
+               ROW_NUMBER() OVER (PARTITION BY genre ORDER BY rating DESC, title, id) AS rank
+        FROM main_app_movie
+    ) ranked WHERE rank <= 10
+'''
+
+
+def create_genre_top_movies(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE MATERIALIZED VIEW main_app_genretopmovie AS {RANKED_MOVIES}')
+        # REFRESH ... CONCURRENTLY needs a unique index on the view.
+        schema_editor.execute('CREATE UNIQUE INDEX genretopmovie_movie_idx ON main_app_genretopmovie (movie_id)')
+    else:
+        # Without materialized views the query is kept as a plain view that refresh() refills a table from.
+        schema_editor.execute(f'CREATE VIEW main_app_genretopmovie_ranked AS {RANKED_MOVIES}')
+        schema_editor.execute(
+            'CREATE TABLE main_app_genretopmovie ('
+            'movie_id bigint NOT NULL PRIMARY KEY, genre varchar(6) NOT NULL, rank integer NOT NULL, '
+            'title varchar(150) NOT NULL, rating decimal(3, 1) NOT NULL)'
+        )
+        schema_editor.execute('INSERT INTO main_app_genretopmovie (movie_id, genre, rank, title, rating) '
+                              'SELECT movie_id, genre, rank, title, rating FROM main_app_genretopmovie_ranked')
+
+    schema_editor.execute('CREATE INDEX genretopmovie_genre_rank_idx ON main_app_genretopmovie (genre, rank)')
+
+
+def drop_genre_top_movies(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP MATERIALIZED VIEW main_app_genretopmovie')
+    else:
+        schema_editor.execute('DROP TABLE main_app_genretopmovie')
+        schema_editor.execute('DROP VIEW main_app_genretopmovie_ranked')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0005_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenreTopMovie',
+            fields=[
+                ('movie', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='genre_rank', serialize=False, to='main_app.movie')),
+                ('genre', models.CharField(choices=[('Action', 'Action'), ('Comedy', 'Comedy'), ('Drama', 'Drama'), ('Other', 'Other')], max_length=6)),
+                ('rank', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=150)),
+                ('rating', models.DecimalField(decimal_places=1, max_digits=3)),
+            ],
+            options={
+                'db_table': 'main_app_genretopmovie',
+                'managed': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(('is_awarded', True)), fields=['-rating', 'title'], name='movie_awarded_rating_idx'),
+        ),
+        migrations.RunPython(create_genre_top_movies, drop_genre_top_movies),
+    ]
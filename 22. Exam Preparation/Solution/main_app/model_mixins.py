@@ -1,11 +1,75 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Rows stamped less than this long ago are held back from the feeds. The stamp is taken before
+# its transaction commits, so a slow transaction can still add rows behind them, and a token
+# already past those rows would skip them for good.
+FEED_HOLD_BACK = timedelta(seconds=30)
+
+
+def _feed_token(timestamp, pk):
+    return f'{timestamp.isoformat()}|{pk}'
+
+
+def _feed_position(since):
+    if isinstance(since, str):
+        timestamp, pk = since.rsplit('|', 1)
+        return parse_datetime(timestamp), int(pk)
+
+    return since, 0
+
+
+def _feed_batch(queryset, timestamp_field, since, batch, hold_back):
+    rows = queryset \
+        .filter(**{f'{timestamp_field}__lte': timezone.now() - hold_back}) \
+        .order_by(timestamp_field, 'pk')
+
+    if since is not None:
+        timestamp, pk = _feed_position(since)
+        rows = rows.filter(Q(**{f'{timestamp_field}__gt': timestamp})
+                           | Q(**{timestamp_field: timestamp, 'pk__gt': pk}))
+
+    rows = list(rows[:batch])
+    if not rows:
+        return rows, since
+
+    return rows, _feed_token(getattr(rows[-1], timestamp_field), rows[-1].pk)
+
+
+class LastUpdatedQuerySet(models.QuerySet):
+    # auto_now only applies in save(), so update() stamps the rows itself to keep them in the feed.
+    def update(self, **kwargs):
+        kwargs.setdefault('last_updated', timezone.now())
+        return super().update(**kwargs)
 
 
 class LastUpdatedMixin(models.Model):
+    # The model's manager has to be built on LastUpdatedQuerySet as well.
     last_updated = models.DateTimeField(auto_now=True)
 
+    # Feeds take either a datetime or the token returned by the previous batch and
+    # return (rows, token); pass the token back in to resume where the batch ended.
+    @classmethod
+    def changed_since(cls, since=None, batch: int = 500, hold_back: timedelta = FEED_HOLD_BACK):
+        return _feed_batch(cls.objects.all(), 'last_updated', since, batch, hold_back)
+
+    @classmethod
+    def deleted_since(cls, since=None, batch: int = 500, hold_back: timedelta = FEED_HOLD_BACK):
+        from main_app.models import Tombstone
+
+        tombstones = Tombstone.objects.filter(model_label=cls._meta.label_lower)
+        rows, token = _feed_batch(tombstones, 'deleted_at', since, batch, hold_back)
+        return [tombstone.object_pk for tombstone in rows], token
+
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(fields=['last_updated', 'id'], name='%(app_label)s_%(class)s_changed_idx'),
+        ]
 
 
 class IsAwardedMixin(models.Model):
@@ -13,3 +77,18 @@ class IsAwardedMixin(models.Model):
 
     class Meta:
         abstract = True
+
+
+class MaintainedCountersMixin(models.Model):
+    # Columns kept up to date in SQL by main_app.signals. Saving an existing instance never
+    # writes back the copies loaded with it, which may be stale by now.
+    maintained_counters = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in self.maintained_counters]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
@@ -1,8 +1,11 @@
+from collections import defaultdict
+from itertools import islice
+
 from django.core.validators import MinLengthValidator, MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, connections, models, router, transaction
 
-from main_app.custom_model_manager import DirectorManager
-from main_app.model_mixins import LastUpdatedMixin, IsAwardedMixin
+from main_app.custom_model_manager import CAST_SEPARATOR, DirectorManager, ActorManager, GenreTopMovieManager, MovieQuerySet
+from main_app.model_mixins import LastUpdatedMixin, IsAwardedMixin, MaintainedCountersMixin
 
 
 # Create your models here.
@@ -20,20 +23,92 @@ class BasePerson(models.Model):
     def __str__(self):
         return self.full_name
 
+    @classmethod
+    def bulk_upsert(cls, records, match_on=('full_name', 'birth_date'), chunk_size: int = 1000) -> dict:
+        match_fields = [cls._meta.get_field(name) for name in match_on]
+        auto_now_fields = {field.name for field in cls._meta.concrete_fields if getattr(field, 'auto_now', False)}
+        # Counters, last_updated and the pk are maintained by the models, never taken from a record.
+        writable = {field.name for field in cls._meta.concrete_fields if field.editable and not field.primary_key}
+        using = router.db_for_write(cls)
+        records = iter(records)
+        inserted, updated = 0, 0
+
+        while chunk := list(islice(records, chunk_size)):
+            # A conflicting row may only be touched once per statement, so the last record per key wins.
+            people = {}
+            for record in chunk:
+                if unknown := record.keys() - writable:
+                    raise ValueError(f'{cls.__name__}.bulk_upsert() cannot set {", ".join(sorted(unknown))}.')
+                person = cls(**record)
+                key = tuple(field.to_python(getattr(person, field.attname)) for field in match_fields)
+                people[key] = (frozenset(record), person)
+
+            existing = cls.objects \
+                .using(using) \
+                .filter(**{f'{match_on[0]}__in': {key[0] for key in people}}) \
+                .values_list(*match_on)
+            num_existing = len(people.keys() & set(existing))
+
+            # Only the fields a record sets are written over an existing row, so records that
+            # set different fields go in separate statements.
+            groups = defaultdict(list)
+            for names, person in people.values():
+                groups[names].append(person)
+
+            with transaction.atomic(using=using):
+                for names, group in groups.items():
+                    update_fields = sorted((names | auto_now_fields) - set(match_on))
+                    cls.objects.using(using).bulk_create(
+                        group,
+                        update_conflicts=bool(update_fields),
+                        ignore_conflicts=not update_fields,
+                        unique_fields=match_on if update_fields else None,
+                        update_fields=update_fields or None,
+                    )
+
+            inserted += len(people) - num_existing
+            updated += num_existing
+
+        return {'inserted': inserted, 'updated': updated}
+
     class Meta:
         abstract = True
+        constraints = [
+            models.UniqueConstraint(fields=['full_name', 'birth_date'], name='%(app_label)s_%(class)s_unique_person'),
+        ]
 
 
-class Director(BasePerson):
+class Director(MaintainedCountersMixin, BasePerson):
     years_of_experience = models.SmallIntegerField(
         default=0,
         validators=[MinValueValidator(0)])
+    movie_count = models.PositiveIntegerField(default=0, editable=False)
 
     objects = DirectorManager()
 
+    maintained_counters = ('movie_count',)
+
+    class Meta(BasePerson.Meta):
+        indexes = [
+            models.Index(fields=['-movie_count', 'full_name'], name='director_movie_count_idx'),
+        ]
+
+
+class Actor(LastUpdatedMixin, IsAwardedMixin, MaintainedCountersMixin, BasePerson):
+    starring_count = models.PositiveIntegerField(default=0, editable=False)
+    starring_rating_sum = models.DecimalField(max_digits=10, decimal_places=1, default=0, editable=False)
+    cast_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ActorManager()
 
-class Actor(LastUpdatedMixin, IsAwardedMixin, BasePerson):
-    pass
+    maintained_counters = ('starring_count', 'starring_rating_sum', 'cast_count')
+
+    class Meta(BasePerson.Meta):
+        indexes = [
+            *LastUpdatedMixin.Meta.indexes,
+            models.Index(fields=['-starring_count', 'full_name'], name='actor_starring_count_idx'),
+            models.Index(fields=['-cast_count', 'full_name'], name='actor_cast_count_idx'),
+        ]
 
 
 class Movie(LastUpdatedMixin, IsAwardedMixin):
@@ -75,5 +150,67 @@ class Movie(LastUpdatedMixin, IsAwardedMixin):
     actors = models.ManyToManyField(Actor,
                                     related_name='actor_movies')
 
+    objects = MovieQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            *LastUpdatedMixin.Meta.indexes,
+            models.Index(fields=['release_date', 'id'], name='movie_release_date_idx'),
+            models.Index(fields=['-rating', 'title'], name='movie_awarded_rating_idx', condition=models.Q(is_awarded=True)),
+        ]
+
     def __str__(self):
         return self.title
+
+    @property
+    def page_cursor(self):
+        return self.release_date, self.pk
+
+    @property
+    def cast_names(self) -> list:
+        # Prefer names loaded alongside the movie: with_cast() or prefetch_cast(), in that order.
+        if 'cast_list' in self.__dict__:
+            names = [name for name in self.cast_list.split(CAST_SEPARATOR) if name]
+            if connections[self._state.db or DEFAULT_DB_ALIAS].vendor != 'postgresql':
+                names.sort()
+            return names
+
+        if 'actors' in getattr(self, '_prefetched_objects_cache', {}):
+            return [actor.full_name for actor in self.actors.all()]
+
+        return list(self.actors.order_by('full_name').values_list('full_name', flat=True))
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class GenreTopMovie(models.Model):
+    movie = models.OneToOneField(Movie,
+                                 on_delete=models.DO_NOTHING,
+                                 primary_key=True,
+                                 db_constraint=False,
+                                 related_name='genre_rank')
+    genre = models.CharField(max_length=6, choices=Movie.GENRE_CHOICES)
+    rank = models.PositiveIntegerField()
+    title = models.CharField(max_length=150)
+    rating = models.DecimalField(max_digits=3, decimal_places=1)
+
+    objects = GenreTopMovieManager()
+
+    class Meta:
+        # The top 10 movies per genre, created by migration 0006: a materialized view on PostgreSQL,
+        # a table elsewhere. Changing the ranking takes a new migration.
+        managed = False
+        db_table = 'main_app_genretopmovie'
+
+
+class Tombstone(models.Model):
+    model_label = models.CharField(max_length=100)
+    object_pk = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model_label', 'deleted_at', 'id'], name='tombstone_feed_idx'),
+        ]
@@ -0,0 +1,81 @@
+import uuid
+
+from django.db import connections
+
+
+class PreparedQuery:
+    # Compiles the queryset returned by build() once per (database, shape) and reuses the SQL.
+    # A shape is the set of keyword arguments that are not None; build() receives a unique
+    # placeholder string for each of them, which execute() swaps for the real values.
+    def __init__(self, build):
+        self.build = build
+        self._compiled = {}
+
+    def _compile(self, manager, using, names):
+        placeholders = {name: f'prepared{uuid.uuid4().hex}' for name in names}
+        compiler = self.build(manager, **placeholders).query.get_compiler(using)
+        sql, params = compiler.as_sql()
+
+        slots = []
+        for param in params:
+            name = next((name for name, placeholder in placeholders.items()
+                         if isinstance(param, str) and placeholder in param), None)
+            slots.append((name, placeholders.get(name), param))
+
+        columns = [column.target.attname for column, _, _ in compiler.select]
+        converters = compiler.get_converters([column for column, _, _ in compiler.select])
+
+        return sql, slots, columns, converters
+
+    @staticmethod
+    def _bind(connection, slots, values):
+        params = []
+        for name, placeholder, param in slots:
+            if name is None:
+                params.append(param)
+            elif param == placeholder:
+                params.append(values[name])
+            else:
+                # Anything wrapped around the placeholder is a LIKE pattern (contains, startswith, ...).
+                params.append(param.replace(placeholder, connection.ops.prep_for_like_query(values[name])))
+
+        return params
+
+    @staticmethod
+    def _server_side_prepare(connection):
+        if connection.vendor != 'postgresql':
+            return False
+
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+        # Client-side binding cursors (Django's default for psycopg 3) cannot prepare statements.
+        return is_psycopg3 and connection.settings_dict['OPTIONS'].get('server_side_binding', False)
+
+    def execute(self, manager, **values):
+        values = {name: value for name, value in values.items() if value is not None}
+        using = manager.db
+        connection = connections[using]
+
+        key = (using, tuple(sorted(values)))
+        if key not in self._compiled:
+            self._compiled[key] = self._compile(manager, using, key[1])
+        sql, slots, columns, converters = self._compiled[key]
+
+        params = self._bind(connection, slots, values)
+        with connection.cursor() as cursor:
+            if self._server_side_prepare(connection):
+                cursor.cursor.execute(sql, params, prepare=True)
+            else:
+                # sqlite3 keeps a per-connection cache of compiled statements keyed by the SQL text.
+                cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        objects = []
+        for row in rows:
+            row = list(row)
+            for position, (functions, expression) in converters.items():
+                for function in functions:
+                    row[position] = function(row[position], expression, connection)
+            objects.append(manager.model.from_db(using, columns, row))
+
+        return objects
@@ -0,0 +1,104 @@
+from django.apps import apps
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from main_app.model_mixins import LastUpdatedMixin
+from main_app.models import Actor, Director, Movie, Tombstone
+
+
+def _rating(movie):
+    # Ratings assigned in Python may still be floats until the instance is reloaded.
+    return Movie._meta.get_field('rating').to_python(movie.rating)
+
+
+@receiver(pre_save, sender=Movie)
+def remember_previous_movie(sender, instance, raw, **kwargs):
+    instance._previous = None
+    if not raw and not instance._state.adding:
+        instance._previous = Movie.objects \
+            .filter(pk=instance.pk) \
+            .values('director_id', 'starring_actor_id', 'rating') \
+            .first()
+
+
+@receiver(post_save, sender=Movie)
+def count_saved_movie(sender, instance, created, raw, **kwargs):
+    # Fixtures (loaddata) save raw and carry the counters as they were dumped.
+    if raw:
+        return
+
+    if created:
+        Director.objects.adjust([instance.director_id], movie_count=1)
+        Actor.objects.adjust([instance.starring_actor_id], starring_count=1, starring_rating_sum=_rating(instance))
+        return
+
+    previous = instance._previous
+    if previous is None:
+        return
+
+    if previous['director_id'] != instance.director_id:
+        Director.objects.adjust([previous['director_id']], movie_count=-1)
+        Director.objects.adjust([instance.director_id], movie_count=1)
+
+    if previous['starring_actor_id'] != instance.starring_actor_id:
+        Actor.objects.adjust([previous['starring_actor_id']], starring_count=-1, starring_rating_sum=-previous['rating'])
+        Actor.objects.adjust([instance.starring_actor_id], starring_count=1, starring_rating_sum=_rating(instance))
+    else:
+        Actor.objects.adjust([instance.starring_actor_id], starring_rating_sum=_rating(instance) - previous['rating'])
+
+
+@receiver(pre_delete, sender=Movie)
+def remember_movie_cast(sender, instance, **kwargs):
+    instance._deleted_actor_ids = list(instance.actors.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Movie)
+def count_deleted_movie(sender, instance, **kwargs):
+    Director.objects.adjust([instance.director_id], movie_count=-1)
+    Actor.objects.adjust([instance.starring_actor_id], starring_count=-1, starring_rating_sum=-_rating(instance))
+    Actor.objects.adjust(instance._deleted_actor_ids, cast_count=-1)
+
+
+@receiver(m2m_changed, sender=Movie.actors.through)
+def count_movie_cast(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_movie_count = instance.actor_movies.count()
+        else:
+            instance._cleared_actor_ids = list(instance.actors.values_list('pk', flat=True))
+        return
+
+    if action == 'post_clear':
+        if reverse:
+            Actor.objects.adjust([instance.pk], cast_count=-instance._cleared_movie_count)
+        else:
+            Actor.objects.adjust(instance._cleared_actor_ids, cast_count=-1)
+        return
+
+    if action == 'pre_remove':
+        # pk_set holds whatever the caller passed to remove(), including rows that are not linked.
+        linked = instance.actor_movies if reverse else instance.actors
+        instance._removed_pks = set(linked.filter(pk__in=pk_set).values_list('pk', flat=True))
+        return
+
+    if action == 'post_remove':
+        pk_set = instance._removed_pks
+
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    sign = 1 if action == 'post_add' else -1
+    if reverse:
+        Actor.objects.adjust([instance.pk], cast_count=sign * len(pk_set))
+    else:
+        Actor.objects.adjust(pk_set, cast_count=sign)
+
+
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(model_label=sender._meta.label_lower, object_pk=instance.pk)
+
+
+# Connected per model rather than globally, so models without a change feed keep Django's fast deletes.
+for model in apps.get_app_config('main_app').get_models():
+    if issubclass(model, LastUpdatedMixin):
+        post_delete.connect(record_tombstone, sender=model, dispatch_uid=f'tombstone_{model._meta.label_lower}')
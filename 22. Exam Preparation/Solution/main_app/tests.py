@@ -1,3 +1,388 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core import serializers
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from caller import get_top_actor, get_top_rated_awarded_movie, increase_rating
+from main_app.models import Actor, Director, GenreTopMovie, Movie
+from orm_skeleton.db_router import PrimaryReplicaRouter, replica_pinning_middleware, request_scope
+
+
+class GetTopActorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        director = Director.objects.create(full_name='Director')
+        cls.first = Actor.objects.create(full_name='First Actor')
+        cls.second = Actor.objects.create(full_name='Second Actor')
+
+        Movie.objects.create(title='Movie One', release_date='2000-01-01', rating=8.0,
+                             director=director, starring_actor=cls.first)
+        Movie.objects.create(title='Movie Two', release_date='2001-01-01', rating=7.0,
+                             director=director, starring_actor=cls.first)
+        Movie.objects.create(title='Movie Three', release_date='2002-01-01', rating=9.0,
+                             director=director, starring_actor=cls.second)
+
+    def test_top_actor_is_reported_in_a_single_query(self):
+        with self.assertNumQueries(1):
+            result = get_top_actor()
+
+        self.assertTrue(result.startswith('Top Actor: First Actor, starring in movies: '))
+        self.assertIn('Movie One', result)
+        self.assertIn('Movie Two', result)
+        self.assertNotIn('Movie Three', result)
+        self.assertTrue(result.endswith('movies average rating: 7.5'))
+
+    def test_no_starring_actor_returns_empty_string(self):
+        Movie.objects.update(starring_actor=None)
+        Actor.objects.rebuild_counters()
+
+        self.assertEqual(get_top_actor(), '')
+
+
+class DirectorSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Director.objects.create(full_name='Anna Smith', nationality='British', birth_date='1970-01-01')
+        Director.objects.create(full_name='Bob 100% Real', nationality='American', birth_date='1971-01-01')
+        Director.objects.create(full_name='Carl_Smith', nationality='british', birth_date='1972-01-01')
+
+    def assertMatchesOrm(self, name=None, nationality=None):
+        expected = Director.objects.all()
+        if name is not None:
+            expected = expected.filter(full_name__icontains=name)
+        if nationality is not None:
+            expected = expected.filter(nationality__icontains=nationality)
+
+        self.assertEqual(
+            [director.pk for director in Director.objects.search(name, nationality)],
+            list(expected.order_by('full_name').values_list('pk', flat=True)),
+        )
+
+    def test_every_shape_matches_the_orm_as_parameters_change(self):
+        for name, nationality in [('smith', None), ('anna', None), (None, 'BRIT'), (None, 'ameri'),
+                                  ('smith', 'british'), ('bob', 'british'), ('%', None), ('_', None),
+                                  ('100%', 'american'), ('nobody', None)]:
+            with self.subTest(name=name, nationality=nationality):
+                self.assertMatchesOrm(name, nationality)
+
+    def test_results_are_converted_model_instances(self):
+        director = Director.objects.search(name='anna')[0]
+
+        self.assertEqual(director.full_name, 'Anna Smith')
+        self.assertEqual(director.birth_date, date(1970, 1, 1))
+        self.assertFalse(director._state.adding)
+
+
+class FixedLagRouter(PrimaryReplicaRouter):
+    lags = {'replica1': 3.0, 'replica2': 0.5}
+
+    def replica_lag(self, alias):
+        return self.lags[alias]
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'], DATABASE_REPLICA_SELECTION='round_robin')
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def test_reads_alternate_between_replicas(self):
+        router = PrimaryReplicaRouter()
+
+        with request_scope():
+            self.assertEqual([router.db_for_read(Movie) for _ in range(4)],
+                             ['replica1', 'replica2', 'replica1', 'replica2'])
+
+    def test_reads_are_pinned_to_the_primary_after_a_write_until_the_request_ends(self):
+        router = PrimaryReplicaRouter()
+
+        with request_scope():
+            self.assertEqual(router.db_for_write(Movie), 'default')
+            self.assertEqual(router.db_for_read(Director), 'default')
+
+        with request_scope():
+            self.assertIn(router.db_for_read(Director), ('replica1', 'replica2'))
+
+    @override_settings(DATABASE_REPLICA_SELECTION='least_lag', DATABASE_REPLICA_MAX_LAG=1)
+    def test_least_lag_picks_the_freshest_replica_or_the_primary(self):
+        router = FixedLagRouter()
+
+        with request_scope():
+            self.assertEqual(router.db_for_read(Movie), 'replica2')
+
+        router = FixedLagRouter()
+        router.lags = {'replica1': 3.0, 'replica2': 2.0}
+        with request_scope():
+            self.assertEqual(router.db_for_read(Movie), 'default')
+
+    def test_contrib_apps_always_read_from_the_primary(self):
+        router = PrimaryReplicaRouter()
+
+        with request_scope():
+            self.assertEqual(router.db_for_read(Session), 'default')
+            self.assertEqual(router.db_for_read(User), 'default')
+            self.assertIn(router.db_for_read(Movie), ('replica1', 'replica2'))
+
+    def test_middleware_pins_unsafe_requests_to_the_primary(self):
+        router = PrimaryReplicaRouter()
+        middleware = replica_pinning_middleware(lambda request: router.db_for_read(Movie))
+
+        self.assertEqual(middleware(RequestFactory().post('/')), 'default')
+        self.assertIn(middleware(RequestFactory().get('/')), ('replica1', 'replica2'))
+
+
+class CastNamesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.director = Director.objects.create(full_name='Director')
+        cls.actors = [Actor.objects.create(full_name=name) for name in ('Zoe', 'Adam', 'Mia')]
+
+    def create_movies(self, count):
+        for number in range(count):
+            movie = Movie.objects.create(title=f'Movie {number:03}', release_date='2000-01-01', rating=5.0,
+                                         director=self.director, is_awarded=True)
+            movie.actors.set(self.actors[:number % 3 + 1])
+
+    def render(self, movies):
+        return [', '.join(movie.cast_names) for movie in movies]
+
+    def test_prefetched_cast_costs_two_queries_for_any_number_of_movies(self):
+        for count in (1, 10):
+            with self.subTest(count=count):
+                Movie.objects.all().delete()
+                self.create_movies(count)
+
+                with self.assertNumQueries(2):
+                    casts = self.render(Movie.objects.prefetch_cast().order_by('title'))
+
+                self.assertEqual(len(casts), count)
+                self.assertEqual(casts[:3], ['Zoe', 'Adam, Zoe', 'Adam, Mia, Zoe'][:count])
+
+    def test_aggregated_cast_costs_one_query_for_any_number_of_movies(self):
+        for count in (1, 10):
+            with self.subTest(count=count):
+                Movie.objects.all().delete()
+                self.create_movies(count)
+
+                with self.assertNumQueries(1):
+                    casts = self.render(Movie.objects.with_cast().order_by('title'))
+
+                self.assertEqual(casts[:3], ['Zoe', 'Adam, Zoe', 'Adam, Mia, Zoe'][:count])
+
+    def test_movie_without_cast_or_preloading(self):
+        self.create_movies(2)
+        movie = Movie.objects.get(title='Movie 001')
+        movie.actors.clear()
+
+        self.assertEqual(Movie.objects.with_cast().get(pk=movie.pk).cast_names, [])
+        self.assertEqual(Movie.objects.get(title='Movie 000').cast_names, ['Zoe'])
+
+    def test_top_rated_awarded_movie_uses_the_prefetched_cast(self):
+        self.create_movies(3)
+
+        with self.assertNumQueries(2):
+            result = get_top_rated_awarded_movie()
+
+        self.assertEqual(result, 'Top rated awarded movie: Movie 000, rating: 5.0. Starring actor: N/A. Cast: Zoe.')
+
+
+class MovieCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.director = Director.objects.create(full_name='Director')
+        cls.actor = Actor.objects.create(full_name='Actor')
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        movie = Movie.objects.create(title='Movie One', release_date='2000-01-01', rating=8.0,
+                                     director=self.director, starring_actor=self.actor)
+        movie.actors.add(self.actor)
+
+        self.actor.is_awarded = True
+        self.actor.save()
+        self.director.years_of_experience = 10
+        self.director.save()
+
+        self.actor.refresh_from_db()
+        self.director.refresh_from_db()
+        self.assertTrue(self.actor.is_awarded)
+        self.assertEqual((self.actor.starring_count, self.actor.starring_rating_sum, self.actor.cast_count),
+                         (1, Decimal('8.0'), 1))
+        self.assertEqual((self.director.years_of_experience, self.director.movie_count), (10, 1))
+
+    def test_reloading_a_fixture_keeps_the_counters(self):
+        Movie.objects.create(title='Movie One', release_date='2000-01-01', rating=8.0,
+                             director=self.director, starring_actor=self.actor)
+        fixture = serializers.serialize('json', [Director.objects.get(), Actor.objects.get(), Movie.objects.get()])
+
+        # What loaddata does: the rows are saved raw, over the existing ones.
+        for deserialized in serializers.deserialize('json', fixture):
+            deserialized.save()
+
+        self.actor.refresh_from_db()
+        self.director.refresh_from_db()
+        self.assertEqual((self.actor.starring_count, self.actor.starring_rating_sum), (1, Decimal('8.0')))
+        self.assertEqual(self.director.movie_count, 1)
+
+    def test_removing_actors_that_are_not_in_the_cast_changes_nothing(self):
+        other = Actor.objects.create(full_name='Other Actor')
+        movie = Movie.objects.create(title='Movie One', release_date='2000-01-01', rating=8.0,
+                                     director=self.director)
+        movie.actors.add(self.actor)
+
+        movie.actors.remove(self.actor)
+        movie.actors.remove(self.actor, other)
+        self.actor.actor_movies.remove(movie)
+
+        self.assertEqual(list(Actor.objects.order_by('pk').values_list('cast_count', flat=True)), [0, 0])
+
+        movie.actors.add(self.actor, other)
+        other.actor_movies.remove(movie)
+        movie.actors.remove(other)
+
+        self.assertEqual(list(Actor.objects.order_by('pk').values_list('cast_count', flat=True)), [1, 0])
+
+
+
+class BulkUpsertTests(TestCase):
+    def setUp(self):
+        self.existing = Director.objects.create(full_name='Existing Director', birth_date=date(1970, 5, 1),
+                                                nationality='Bulgarian', years_of_experience=3)
+
+    def test_counts_inserted_and_updated_people_across_chunks(self):
+        result = Director.bulk_upsert([
+            {'full_name': 'Existing Director', 'birth_date': '1970-05-01', 'years_of_experience': 4},
+            {'full_name': 'New Director', 'birth_date': '1980-01-01'},
+            {'full_name': 'New Director', 'birth_date': '1980-01-01', 'years_of_experience': 7},
+            {'full_name': 'Another Director', 'birth_date': date(1990, 2, 2), 'nationality': 'French'},
+        ], chunk_size=3)
+
+        self.assertEqual(result, {'inserted': 2, 'updated': 1})
+        self.assertEqual(
+            list(Director.objects.order_by('full_name').values_list('full_name', 'nationality', 'years_of_experience')),
+            [('Another Director', 'French', 0), ('Existing Director', 'Bulgarian', 4), ('New Director', 'Unknown', 7)],
+        )
+
+    def test_fields_a_record_omits_are_left_as_they_are(self):
+        Movie.objects.create(title='Movie One', release_date='2000-01-01', director=self.existing)
+
+        result = Director.bulk_upsert([
+            {'full_name': 'Existing Director', 'birth_date': '1970-05-01', 'years_of_experience': 12},
+            {'full_name': 'New Director', 'birth_date': '1980-01-01', 'nationality': 'German'},
+            {'full_name': 'Matched Only', 'birth_date': '1985-01-01'},
+        ])
+
+        self.assertEqual(result, {'inserted': 2, 'updated': 1})
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.nationality, self.existing.years_of_experience, self.existing.movie_count),
+                         ('Bulgarian', 12, 1))
+
+        result = Director.bulk_upsert([
+            {'full_name': 'Existing Director', 'birth_date': '1970-05-01'},
+            {'full_name': 'New Director', 'birth_date': '1980-01-01', 'years_of_experience': 2},
+        ])
+
+        self.assertEqual(result, {'inserted': 0, 'updated': 2})
+        self.assertEqual(
+            list(Director.objects.order_by('full_name').values_list('full_name', 'nationality', 'years_of_experience')),
+            [('Existing Director', 'Bulgarian', 12), ('Matched Only', 'Unknown', 0), ('New Director', 'German', 2)],
+        )
+
+    def test_rejects_counters_and_unknown_fields(self):
+        Movie.objects.create(title='Movie One', release_date='2000-01-01', director=self.existing)
+
+        for record in ({'full_name': 'Existing Director', 'birth_date': '1970-05-01', 'movie_count': 99},
+                       {'full_name': 'Existing Director', 'birth_date': '1970-05-01', 'id': 5},
+                       {'full_name': 'New Director', 'birth_date': '1980-01-01', 'favourite_genre': 'Drama'}):
+            with self.subTest(record=record), self.assertRaises(ValueError):
+                Director.bulk_upsert([record])
+
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.movie_count, 1)
+        self.assertFalse(Director.objects.filter(full_name='New Director').exists())
+
+    def test_actor_upsert_refreshes_last_updated_only(self):
+        actor = Actor.objects.create(full_name='Upserted Actor', is_awarded=True)
+        Actor.objects.filter(pk=actor.pk).update(last_updated='2000-01-01T00:00:00Z')
+
+        Actor.bulk_upsert([{'full_name': 'Upserted Actor', 'birth_date': '1900-01-01', 'nationality': 'Greek'}])
+
+        actor.refresh_from_db()
+        self.assertEqual((actor.nationality, actor.is_awarded), ('Greek', True))
+        self.assertGreater(actor.last_updated.year, 2000)
+
+
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.director = Director.objects.create(full_name='Director')
+        self.movies = [Movie.objects.create(title=f'Movie {number}', release_date='2000-01-01', rating=9.0,
+                                            is_classic=True, director=self.director)
+                       for number in range(3)]
+        self.long_ago = timezone.now() - timedelta(days=1)
+        Movie.objects.update(last_updated=self.long_ago)
+
+    def test_batches_resume_from_the_token(self):
+        rows, token = Movie.changed_since(batch=2)
+        self.assertEqual(rows, self.movies[:2])
+
+        rows, token = Movie.changed_since(token, batch=2)
+        self.assertEqual(rows, self.movies[2:])
+
+        self.assertEqual(Movie.changed_since(token), ([], token))
+
+    def test_rows_changed_by_update_are_stamped(self):
+        _, token = Movie.changed_since()
+
+        self.assertEqual(increase_rating(), 'Rating increased for 3 movies.')
+        Actor.objects.create(full_name='Actor')
+        Actor.objects.update(is_awarded=True)
+
+        self.assertEqual(Movie.changed_since(token), ([], token))
+        self.assertEqual(Movie.changed_since(token, hold_back=timedelta(0))[0], self.movies)
+        self.assertEqual(len(Actor.changed_since(self.long_ago, hold_back=timedelta(0))[0]), 1)
+
+    def test_deletes_are_reported_from_tombstones(self):
+        deleted_pk = self.movies[1].pk
+        self.movies[1].delete()
+
+        self.assertEqual(Movie.deleted_since(), ([], None))
+        pks, token = Movie.deleted_since(hold_back=timedelta(0))
+        self.assertEqual(pks, [deleted_pk])
+        self.assertEqual(Movie.deleted_since(token, hold_back=timedelta(0)), ([], token))
+        self.assertEqual(Actor.deleted_since(hold_back=timedelta(0)), ([], None))
+
+
+class GenreLeaderboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        director = Director.objects.create(full_name='Director')
+        cls.dramas = [Movie.objects.create(title=f'Drama {number:02}', release_date='2000-01-01', genre='Drama',
+                                           rating=number % 6, director=director)
+                      for number in range(12)]
+        cls.comedy = Movie.objects.create(title='Comedy', release_date='2000-01-01', genre='Comedy', rating=7.0,
+                                          director=director)
+
+    def titles(self):
+        return {genre: [entry.title for entry in entries]
+                for genre, entries in GenreTopMovie.objects.leaderboards().items()}
+
+    def test_refresh_ranks_the_top_ten_per_genre(self):
+        GenreTopMovie.objects.refresh()
+
+        self.assertEqual(self.titles(), {
+            'Comedy': ['Comedy'],
+            'Drama': ['Drama 05', 'Drama 11', 'Drama 04', 'Drama 10', 'Drama 03',
+                      'Drama 09', 'Drama 02', 'Drama 08', 'Drama 01', 'Drama 07'],
+        })
+        self.assertEqual([entry.rank for entry in GenreTopMovie.objects.leaderboards()['Drama']], list(range(1, 11)))
+
+    def test_leaderboards_change_only_on_refresh(self):
+        GenreTopMovie.objects.refresh(concurrently=False)
+        Movie.objects.filter(pk=self.dramas[0].pk).update(rating=9.0)
+        self.comedy.delete()
+
+        self.assertIn('Comedy', self.titles())
+
+        GenreTopMovie.objects.refresh()
+
+        self.assertNotIn('Comedy', self.titles())
+        self.assertEqual(self.titles()['Drama'][:2], ['Drama 00', 'Drama 05'])
@@ -0,0 +1,115 @@
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+PRIMARY = 'default'
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+
+
+@contextmanager
+def pin_to_primary():
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+@contextmanager
+def request_scope(pinned=False):
+    # Whatever a request pins is forgotten when it ends, so the next request reads from replicas again.
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def replica_pinning_middleware(get_response):
+    def middleware(request):
+        with request_scope(pinned=request.method in UNSAFE_METHODS):
+            return get_response(request)
+
+    return middleware
+
+
+class PrimaryReplicaRouter:
+    # Sends reads of DATABASE_REPLICA_APPS models to the DATABASE_REPLICAS aliases and everything else,
+    # writes included, to the primary. After the first write in a request (or in a script, until its
+    # request_scope() ends) reads stay on the primary, so the caller always sees its own writes even
+    # when the replicas are lagging behind.
+    def __init__(self):
+        self._round_robin = None
+        self._lag_cache = {}
+
+    @staticmethod
+    def replicas():
+        return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+    def replica_lag(self, alias):
+        connection = connections[alias]
+        if connection.vendor != 'postgresql':
+            return 0.0
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)'
+            )
+            return float(cursor.fetchone()[0])
+
+    def _cached_lag(self, alias):
+        checked_at, lag = self._lag_cache.get(alias, (None, None))
+        if checked_at is None or time.monotonic() - checked_at > getattr(settings, 'DATABASE_REPLICA_LAG_TTL', 1):
+            try:
+                lag = self.replica_lag(alias)
+            except DatabaseError:
+                lag = float('inf')
+            self._lag_cache[alias] = (time.monotonic(), lag)
+
+        return lag
+
+    def _least_lag(self, replicas):
+        max_lag = getattr(settings, 'DATABASE_REPLICA_MAX_LAG', 5)
+        lag, alias = min((self._cached_lag(alias), alias) for alias in replicas)
+
+        return alias if lag <= max_lag else PRIMARY
+
+    def _next_round_robin(self, replicas):
+        if self._round_robin is None or self._round_robin[0] != replicas:
+            self._round_robin = (replicas, itertools.cycle(replicas))
+
+        return next(self._round_robin[1])
+
+    def db_for_read(self, model, **hints):
+        replicas = self.replicas()
+        if not replicas or _pinned_to_primary.get():
+            return PRIMARY
+
+        if model._meta.app_label not in getattr(settings, 'DATABASE_REPLICA_APPS', ()):
+            return PRIMARY
+
+        if getattr(settings, 'DATABASE_REPLICA_SELECTION', 'round_robin') == 'least_lag':
+            return self._least_lag(replicas)
+
+        return self._next_round_robin(replicas)
+
+    def db_for_write(self, model, **hints):
+        _pinned_to_primary.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *self.replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary (streaming replication or sync_replicas).
+        return db not in self.replicas()
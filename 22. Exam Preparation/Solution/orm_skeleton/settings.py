@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'orm_skeleton.db_router.replica_pinning_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +84,31 @@ DATABASES = {
     }
 }
 
+# Read replicas as comma separated SQLite file names, e.g. REPLICA_DATABASES=db_replica1.sqlite3,db_replica2.sqlite3.
+# Copy the primary into them with `python manage.py sync_replicas`; tests run them as mirrors of default.
+for number, replica_name in enumerate(filter(None, os.environ.get('REPLICA_DATABASES', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / replica_name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['orm_skeleton.db_router.PrimaryReplicaRouter']
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Only these apps read from the replicas. Sessions, auth and admin stay on the primary, where
+# a login is visible to the very next request.
+DATABASE_REPLICA_APPS = ['main_app']
+
+# 'round_robin' or 'least_lag'; least_lag falls back to the primary when every replica is
+# more than DATABASE_REPLICA_MAX_LAG seconds behind, and re-checks the lag every DATABASE_REPLICA_LAG_TTL seconds.
+DATABASE_REPLICA_SELECTION = os.environ.get('REPLICA_SELECTION', 'round_robin')
+
+DATABASE_REPLICA_MAX_LAG = 5
+
+DATABASE_REPLICA_LAG_TTL = 1
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
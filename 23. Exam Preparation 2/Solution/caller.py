@@ -15,7 +15,7 @@ def get_profiles(search_string=None):
     result = []
     if search_string is not None:
         profiles = Profile.objects \
-            .annotate(num_orders=Count('orders')) \
+            .annotate(num_orders=F('order_count')) \
             .filter(Q(full_name__icontains=search_string)
                     | Q(email__icontains=search_string)
                     | Q(phone_number__icontains=search_string)) \
@@ -62,28 +62,17 @@ def get_top_products():
 
 
 def apply_discounts():
-    discounted_orders = Order.objects.annotate(num_products=Count('products')) \
-        .filter(num_products__gt=2, is_completed=False) \
+    discounted_orders = Order.objects \
+        .filter(item_count__gt=2, is_completed=False) \
         .update(total_price=F('total_price') * 0.9)
 
     return f'Discount applied to {discounted_orders} orders.'
 
 
 def complete_order():
-    order = Order.objects.filter(is_completed=False).order_by('creation_date').first()
-    if order is None:
+    if not Order.objects.complete_next():
         return ""
 
-    order.is_completed = True
-    order.save()
-
-    for product in order.products.all():
-        product.in_stock -= 1
-
-        if product.in_stock == 0:
-            product.is_available = False
-        product.save()
-
     return "Order has been completed!"
 
 
@@ -1,7 +1,95 @@
-from django.db import models
-from django.db.models import Count
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
 
 
 class CustomProfileManager(models.Manager):
     def get_regular_customers(self):
-        return self.annotate(num_orders=Count('orders')).filter(num_orders__gt=2).order_by('-num_orders')
+        return self.filter(order_count__gt=2).annotate(num_orders=F('order_count')).order_by('-order_count')
+
+    def adjust_order_counts(self, profile_ids, delta: int) -> int:
+        profile_ids = [profile_id for profile_id in profile_ids if profile_id is not None]
+        if not profile_ids or not delta:
+            return 0
+
+        return self.filter(pk__in=profile_ids).update(order_count=F('order_count') + delta)
+
+    def rebuild_order_counts(self, profile_ids=None) -> int:
+        from main_app.models import Order
+
+        orders = Order.objects.filter(profile=OuterRef('pk')).values('profile')
+        profiles = self.all() if profile_ids is None else self.filter(pk__in=profile_ids)
+
+        return profiles.update(order_count=Coalesce(Subquery(orders.annotate(num=Count('pk')).values('num')), 0))
+
+
+# On PostgreSQL only queries with constant creation_date bounds, i.e. created_between(), are pruned to
+# the partitions they need. The open-order queue (claim_open(), complete()), latest('creation_date') and
+# lookups by pk alone have no such bound and plan every partition, one index probe each, so their cost
+# grows with the number of attached partitions; `order_partitions --explain` shows it.
+class CustomOrderManager(models.Manager):
+    def created_between(self, start, end):
+        return self.filter(creation_date__gte=start, creation_date__lt=end)
+
+    def claim_open(self, batch_size: int = 1, exclude=()) -> list:
+        # Must run inside a transaction. Rows locked by another worker are skipped rather than
+        # waited for, so parallel workers never claim, or block on, the same order.
+        return list(
+            self.select_for_update(skip_locked=True)
+                .filter(is_completed=False)
+                .exclude(pk__in=list(exclude))
+                .order_by('creation_date', 'pk')
+                .values_list('pk', flat=True)[:batch_size]
+        )
+
+    def complete(self, order_ids) -> int:
+        from main_app.models import Product
+
+        order_ids = list(order_ids)
+        if not order_ids:
+            return 0
+
+        self.filter(pk__in=order_ids).update(is_completed=True)
+
+        ordered = self.model.products.through.objects.filter(order_id__in=order_ids)
+        if len(order_ids) == 1:
+            quantity = Value(1)
+        else:
+            # A product in several of the claimed orders loses one unit per order.
+            quantity = Subquery(
+                ordered.filter(product=OuterRef('pk')).values('product').annotate(num=Count('pk')).values('num')
+            )
+
+        # Both assignments read the old in_stock, so is_available is computed from the decremented value.
+        # Stock runs out at zero instead of failing the CHECK constraint, which would roll the claim back
+        # and leave the same order at the head of the queue for every later call.
+        Product.objects.filter(pk__in=ordered.values('product')).update(
+            in_stock=Greatest(F('in_stock') - quantity, Value(0)),
+            is_available=Case(When(in_stock__gt=quantity, then=Value(True)), default=Value(False)),
+        )
+
+        return len(order_ids)
+
+    def adjust_item_counts(self, order_ids, delta: int) -> int:
+        order_ids = [order_id for order_id in order_ids if order_id is not None]
+        if not order_ids or not delta:
+            return 0
+
+        return self.filter(pk__in=order_ids).update(item_count=F('item_count') + delta)
+
+    def counted_items(self):
+        products = self.model.products.through.objects.filter(order=OuterRef('pk')).values('order')
+
+        return Coalesce(Subquery(products.annotate(num=Count('pk')).values('num')), 0)
+
+    def rebuild_item_counts(self, order_ids=None) -> int:
+        orders = self.all() if order_ids is None else self.filter(pk__in=order_ids)
+
+        return orders.update(item_count=self.counted_items())
+
+    def complete_next(self, batch_size: int = 1) -> list:
+        with transaction.atomic(using=self.db):
+            order_ids = self.claim_open(batch_size)
+            self.complete(order_ids)
+
+        return order_ids
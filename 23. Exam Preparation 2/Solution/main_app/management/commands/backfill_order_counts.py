@@ -0,0 +1,45 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Max, Min
+
+from main_app.models import Profile
+from main_app.order_workers import backfill_order_counts, setup_backfill_worker
+
+
+class Command(BaseCommand):
+    help = ('Recounts Profile.order_count from the orders in parallel chunks of profile ids, '
+            'to repair the counters after writes that bypass the signals, such as bulk_create().')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+        parser.add_argument('--chunk-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be at least 1.')
+
+        bounds = Profile.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            self.stdout.write('There are no profiles.')
+            return
+
+        chunks = [(start, start + options['chunk_size'])
+                  for start in range(bounds['low'], bounds['high'] + 1, options['chunk_size'])]
+
+        # Every worker opens its own connection; none may inherit the parent's.
+        connections.close_all()
+
+        started = time.perf_counter()
+        updated = 0
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(options['workers'], initializer=setup_backfill_worker) as pool:
+            for done, num_updated in enumerate(pool.imap_unordered(backfill_order_counts, chunks), 1):
+                updated += num_updated
+                if done % 100 == 0 or done == len(chunks):
+                    self.stdout.write(f'{done}/{len(chunks)} chunks, {updated} profiles recounted.')
+
+        self.stdout.write(f'Recounted {updated} profiles with {options["workers"]} workers '
+                          f'in {time.perf_counter() - started:.1f}s.')
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Max, Min
+
+from main_app.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Recounts the products of every order in primary key chunks and reports stale Order.item_count values.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--fix', action='store_true', help='Rewrite the stale counts.')
+
+    def handle(self, *args, **options):
+        bounds = Order.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            self.stdout.write('There are no orders.')
+            return
+
+        num_stale = 0
+        for start in range(bounds['low'], bounds['high'] + 1, options['chunk_size']):
+            stale = list(Order.objects
+                .filter(pk__gte=start, pk__lt=start + options['chunk_size'])
+                .annotate(counted=Order.objects.counted_items())
+                .exclude(item_count=F('counted'))
+                .values_list('pk', 'item_count', 'counted'))
+
+            for pk, stored, counted in stale:
+                self.stdout.write(f'Order {pk}: item_count is {stored}, counted {counted}.')
+
+            if stale and options['fix']:
+                Order.objects.rebuild_item_counts([pk for pk, _, _ in stale])
+            num_stale += len(stale)
+
+        action = 'Fixed' if options['fix'] else 'Found'
+        self.stdout.write(f'{action} {num_stale} stale item counts.')
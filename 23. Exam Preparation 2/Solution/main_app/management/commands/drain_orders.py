@@ -0,0 +1,115 @@
+import multiprocessing
+import queue
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from main_app.models import Order
+from main_app.order_workers import new_stats, run_worker
+
+
+class Command(BaseCommand):
+    help = 'Completes open orders with a pool of worker processes that claim batches with SKIP LOCKED.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--limit', type=int, help='Stop after claiming this many orders in total.')
+        parser.add_argument('--max-retries', type=int, default=5,
+                            help='Retries per batch after a lock timeout, deadlock or serialization failure.')
+        parser.add_argument('--lock-timeout', type=int, default=2000,
+                            help='Milliseconds a batch may wait for a row lock (PostgreSQL only).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Have every worker process one batch and roll it back.')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--workers and --batch-size must be at least 1.')
+
+        backlog = Order.objects.filter(is_completed=False).count()
+        self.stdout.write(f'{backlog} open orders, {options["workers"]} workers, batches of {options["batch_size"]}.')
+
+        # Every worker opens its own connection; none may inherit the parent's.
+        connections.close_all()
+
+        context = multiprocessing.get_context('spawn')
+        stop, claimed, results = context.Event(), context.Value('q', 0), context.Queue()
+        worker_options = {name: options[name] for name in
+                          ('batch_size', 'limit', 'max_retries', 'lock_timeout', 'dry_run')}
+        workers = [
+            context.Process(target=run_worker, args=(number, worker_options, stop, claimed, results))
+            for number in range(options['workers'])
+        ]
+
+        def request_stop(signum, frame):
+            self.stderr.write('Stopping after the current batches...')
+            stop.set()
+
+        previous_handlers = {signum: signal.signal(signum, request_stop) for signum in (signal.SIGINT, signal.SIGTERM)}
+        started = time.perf_counter()
+        try:
+            for worker in workers:
+                worker.start()
+
+            reports = self.collect_reports(workers, results)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        self.report(reports, time.perf_counter() - started, options['dry_run'], backlog)
+
+    def collect_reports(self, workers, results, join_timeout=10):
+        reports = {}
+        while len(reports) < len(workers):
+            try:
+                stats = results.get(timeout=1)
+            except queue.Empty:
+                # A worker that has exited has flushed its report already, so once every worker
+                # is gone a missing report is never coming.
+                if any(worker.is_alive() for worker in workers):
+                    continue
+                break
+            reports[stats['worker']] = stats
+
+        for number, worker in enumerate(workers):
+            worker.join(join_timeout)
+            if worker.is_alive():
+                # Workers ignore SIGTERM, so terminate() would not stop one that hangs on exit.
+                worker.kill()
+                worker.join()
+
+            stats = reports.setdefault(number, new_stats(number))
+            if worker.exitcode and not stats['error']:
+                stats['error'] = f'exited with code {worker.exitcode}'
+
+        return list(reports.values())
+
+    def report(self, reports, seconds, dry_run, backlog):
+        for stats in sorted(reports, key=lambda stats: stats['worker']):
+            self.stdout.write(
+                f"worker {stats['worker']}: {stats['orders']} orders in {stats['batches']} batches, "
+                f"{stats['retries']} retries, {stats['lock_waits']} lock waits, "
+                f"{len(stats['failed_orders'])} failed, {stats['seconds']:.1f}s"
+            )
+            if stats['error']:
+                self.stderr.write(f"worker {stats['worker']} stopped: {stats['error']}")
+
+        # Every worker that claims a failing order records it once, so the same order may be in several reports.
+        failed_orders = {}
+        for stats in reports:
+            failed_orders.update(stats['failed_orders'])
+        for order_id, error in sorted(failed_orders.items()):
+            self.stderr.write(f'order {order_id} left open: {error}')
+
+        total = sum(stats['orders'] for stats in reports)
+        rate = total / seconds if seconds else 0
+        verb = 'Would complete' if dry_run else 'Completed'
+        self.stdout.write(
+            f"{verb} {total} orders in {seconds:.1f}s ({rate:.0f} orders/s), "
+            f"{sum(stats['retries'] for stats in reports)} retries, "
+            f"{sum(stats['lock_waits'] for stats in reports)} lock waits, {len(failed_orders)} orders left open."
+        )
+        if dry_run and rate:
+            self.stdout.write(f'Estimated time for the {backlog} open orders: {backlog / rate:.0f}s.')
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main_app.models import Order, Profile
+from main_app.partitions import (add_months, create_partition, detach_partition, is_partitioned, legacy_end,
+                                 month_bound, month_start, monthly_partitions, scanned_partitions)
+
+
+class Command(BaseCommand):
+    help = 'Pre-creates the monthly Order partitions ahead of time and detaches the old ones (PostgreSQL only).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=3, help='Months to create after the current one.')
+        parser.add_argument('--retain', type=int,
+                            help='Detach partitions that end more than this many months before the current one. '
+                                 'Their order_products rows move to <partition>_products. '
+                                 'The legacy partition holding the orders from before migration 0007 '
+                                 'is left alone.')
+        parser.add_argument('--drop', action='store_true',
+                            help='Drop the detached partitions and their order_products rows instead of keeping them.')
+        parser.add_argument('--explain', action='store_true',
+                            help='Show which partitions the Order manager queries scan.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Order partitions only exist on PostgreSQL.')
+
+        current = month_start(timezone.now())
+        with transaction.atomic(), connection.cursor() as cursor:
+            if not is_partitioned(cursor):
+                raise CommandError('main_app_order is not partitioned, run the migrations first.')
+
+            existing = monthly_partitions(cursor)
+            first_monthly = legacy_end(cursor)
+            for offset in range(options['ahead'] + 1):
+                month = add_months(current, offset)
+                if month not in existing and (first_monthly is None or month >= first_monthly):
+                    create_partition(cursor, month)
+                    self.stdout.write(f'Created the partition for {month:%Y-%m}.')
+
+            if options['retain'] is not None:
+                oldest_kept = add_months(current, -options['retain'])
+                for month, name in sorted(existing.items()):
+                    if month < oldest_kept:
+                        num_links = detach_partition(cursor, name, drop=options['drop'])
+                        self.stdout.write(f"{'Dropped' if options['drop'] else 'Detached'} {name} "
+                                          f"and {num_links} order_products rows.")
+
+        if options['explain']:
+            self.explain(current)
+
+    def explain(self, current):
+        profile = Profile.objects.values_list('pk', flat=True).first() or 0
+        queries = {
+            'created_between (this month)': Order.objects
+                .created_between(month_bound(current), month_bound(add_months(current, 1))),
+            'profile orders (last 3 months)': Order.objects
+                .created_between(month_bound(add_months(current, -2)), month_bound(add_months(current, 1)))
+                .filter(profile_id=profile),
+            'claim_open': Order.objects.filter(is_completed=False).order_by('creation_date', 'pk')[:1],
+            'latest': Order.objects.order_by('-creation_date')[:1],
+        }
+
+        for name, queryset in queries.items():
+            partitions = scanned_partitions(queryset)
+            self.stdout.write(f'{name}: {len(partitions)} partitions in the plan ({", ".join(partitions)})')
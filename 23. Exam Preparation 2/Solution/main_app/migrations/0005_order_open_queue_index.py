@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0004_alter_profile_full_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['creation_date', 'id'], name='order_open_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_item_counts(apps, schema_editor):
+    Order = apps.get_model('main_app', 'Order')
+
+    products = Order.products.through.objects.filter(order=OuterRef('pk')).values('order')
+    Order.objects.update(
+        item_count=Coalesce(Subquery(products.annotate(num=Count('pk')).values('num')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0005_order_open_queue_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['item_count'], name='order_open_item_count_idx'),
+        ),
+        migrations.RunPython(populate_item_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,123 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:13
+
+from datetime import date
+
+from django.db import migrations, transaction
+from django.db.migrations.exceptions import IrreversibleError
+from django.utils import timezone
+
+MONTHS_AHEAD = 3
+LEGACY_PARTITION = 'main_app_order_legacy'
+LEGACY_KEY = 'main_app_order_legacy_pkey'
+LEGACY_BOUND = 'main_app_order_legacy_bound'
+
+
+# Frozen copies of the main_app.partitions helpers, so later changes there cannot alter this migration.
+def month_start(day) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f'main_app_order_p{month:%Y%m}'
+
+
+def bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def constraint_names(cursor, table, kind, references=None):
+    cursor.execute(
+        'SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = %s '
+        'AND (%s::text IS NULL OR confrelid = to_regclass(%s))',
+        [table, kind, references, references],
+    )
+    return [name for name, in cursor.fetchall()]
+
+
+def partition_orders(apps, schema_editor):
+    # Turns main_app_order into a table range partitioned by month on creation_date without copying
+    # any rows: the existing table becomes its main_app_order_legacy partition, holding everything
+    # created before next month, and the monthly partitions start from there.
+    #
+    # A partitioned table's primary key has to include the partition key, so it becomes
+    # (id, creation_date); id stays unique through its sequence. Nothing can reference id alone any
+    # more, so main_app_order_products keeps its order_id column without a foreign key constraint.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Order = apps.get_model('main_app', 'Order')
+    execute = schema_editor.execute
+    cutover = add_months(month_start(timezone.now()), 1)
+
+    # The slow steps run first and without blocking writes: building the (id, creation_date) index
+    # and validating a CHECK constraint that matches the legacy partition's bounds, which lets
+    # ATTACH PARTITION skip its own scan of the table. Both are repeatable if the migration stops.
+    execute('DROP INDEX CONCURRENTLY IF EXISTS main_app_order_legacy_pkey')
+    execute('CREATE UNIQUE INDEX CONCURRENTLY main_app_order_legacy_pkey ON main_app_order (id, creation_date)')
+    execute(f'ALTER TABLE main_app_order DROP CONSTRAINT IF EXISTS {LEGACY_BOUND}')
+    execute(f'ALTER TABLE main_app_order ADD CONSTRAINT {LEGACY_BOUND} CHECK (creation_date < {bound(cutover)}) NOT VALID')
+    execute(f'ALTER TABLE main_app_order VALIDATE CONSTRAINT {LEGACY_BOUND}')
+
+    # The rest only changes the catalog, and holds its locks just for that.
+    with transaction.atomic(using=schema_editor.connection.alias), schema_editor.connection.cursor() as cursor:
+        for name in constraint_names(cursor, 'main_app_order_products', 'f', references='main_app_order'):
+            execute(f'ALTER TABLE main_app_order_products DROP CONSTRAINT {name}')
+        for name in constraint_names(cursor, 'main_app_order', 'p'):
+            execute(f'ALTER TABLE main_app_order DROP CONSTRAINT {name}')
+        execute(f'ALTER TABLE main_app_order ADD CONSTRAINT {LEGACY_KEY} PRIMARY KEY USING INDEX {LEGACY_KEY}')
+        # Drops the identity sequence, so the partitioned table can take over its name.
+        execute('ALTER TABLE main_app_order ALTER COLUMN id DROP IDENTITY')
+        # Index names are schema wide; the partitioned table's indexes adopt these below.
+        for index in Order._meta.indexes:
+            execute(f'ALTER INDEX {index.name} RENAME TO {index.name}_legacy')
+        execute(f'ALTER TABLE main_app_order RENAME TO {LEGACY_PARTITION}')
+
+        execute(f'CREATE TABLE main_app_order (LIKE {LEGACY_PARTITION} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+                'PARTITION BY RANGE (creation_date)')
+        execute(f'ALTER TABLE main_app_order DROP CONSTRAINT {LEGACY_BOUND}')
+        execute('ALTER TABLE main_app_order ADD PRIMARY KEY (id, creation_date)')
+        execute('ALTER TABLE main_app_order ADD CONSTRAINT main_app_order_profile_id_fk FOREIGN KEY (profile_id) '
+                'REFERENCES main_app_profile (id) DEFERRABLE INITIALLY DEFERRED')
+
+        execute('CREATE SEQUENCE main_app_order_id_seq OWNED BY main_app_order.id')
+        execute(f"SELECT setval('main_app_order_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM {LEGACY_PARTITION}")
+        execute("ALTER TABLE main_app_order ALTER COLUMN id SET DEFAULT nextval('main_app_order_id_seq')")
+
+        # Adopts the legacy table's primary key index and profile foreign key instead of rebuilding them.
+        execute(f'ALTER TABLE main_app_order ATTACH PARTITION {LEGACY_PARTITION} '
+                f'FOR VALUES FROM (MINVALUE) TO ({bound(cutover)})')
+        month = cutover
+        while month <= add_months(cutover, MONTHS_AHEAD - 1):
+            execute(f'CREATE TABLE {partition_name(month)} PARTITION OF main_app_order '
+                    f'FOR VALUES FROM ({bound(month)}) TO ({bound(add_months(month, 1))})')
+            month = add_months(month, 1)
+        # Catches orders outside the pre-created months until order_partitions creates theirs.
+        execute('CREATE TABLE main_app_order_default PARTITION OF main_app_order DEFAULT')
+
+        # Indexes created on the partitioned table attach the legacy partition's matching ones.
+        execute('CREATE INDEX main_app_order_profile_id_idx ON main_app_order (profile_id)')
+        for index in Order._meta.indexes:
+            schema_editor.add_index(Order, index)
+
+
+def unpartition_orders(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        raise IrreversibleError('main_app_order cannot be turned back into a plain table by this migration.')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY and VALIDATE CONSTRAINT must not run inside the migration's transaction.
+    atomic = False
+
+    dependencies = [
+        ('main_app', '0006_order_item_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_orders, unpartition_orders),
+    ]
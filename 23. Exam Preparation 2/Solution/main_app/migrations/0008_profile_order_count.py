@@ -0,0 +1,35 @@
+# Generated by Django 4.2.4 on 2026-10-18 18:14
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_order_counts(apps, schema_editor):
+    Order = apps.get_model('main_app', 'Order')
+    Profile = apps.get_model('main_app', 'Profile')
+
+    orders = Order.objects.filter(profile=OuterRef('pk')).values('profile')
+    Profile.objects.update(
+        order_count=Coalesce(Subquery(orders.annotate(num=Count('pk')).values('num')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0007_partition_orders_by_month'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='order_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_order_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['-order_count'], name='profile_order_count_idx'),
+        ),
+    ]
@@ -6,3 +6,18 @@ class TimeStampMixin(models.Model):
 
     class Meta:
         abstract = True
+
+
+class MaintainedCountersMixin(models.Model):
+    # Columns kept up to date in SQL by main_app.signals. Saving an existing instance never
+    # writes back the copies loaded with it, which may be stale by now.
+    maintained_counters = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in self.maintained_counters]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
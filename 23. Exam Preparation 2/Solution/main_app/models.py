@@ -1,25 +1,33 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MinLengthValidator, MaxLengthValidator
 
-from main_app.custom_manager import CustomProfileManager
-from main_app.model_mixins import TimeStampMixin
+from main_app.custom_manager import CustomOrderManager, CustomProfileManager
+from main_app.model_mixins import MaintainedCountersMixin, TimeStampMixin
 
 # Create your models here.
 
 
-class Profile(TimeStampMixin, models.Model):
+class Profile(TimeStampMixin, MaintainedCountersMixin, models.Model):
     full_name = models.CharField(max_length=100,
                                  validators=[MinLengthValidator(2), ])
     email = models.EmailField()
     phone_number = models.CharField(max_length=15)
     address = models.TextField()
     is_active = models.BooleanField(default=True)
+    order_count = models.PositiveIntegerField(default=0, editable=False)
 
     objects = CustomProfileManager()
 
+    maintained_counters = ('order_count',)
+
     def __str__(self):
         return self.full_name
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-order_count'], name='profile_order_count_idx'),
+        ]
+
 
 class Product(TimeStampMixin, models.Model):
     name = models.CharField(max_length=100)
@@ -31,7 +39,10 @@ class Product(TimeStampMixin, models.Model):
     is_available = models.BooleanField(default=True)
 
 
-class Order(TimeStampMixin, models.Model):
+# On PostgreSQL the orders table is partitioned by month on creation_date (migration 0007), with the
+# orders from before it in the main_app_order_legacy partition. Its primary key is (id, creation_date)
+# and main_app_order_products.order_id has no FK constraint.
+class Order(TimeStampMixin, MaintainedCountersMixin, models.Model):
     profile = models.ForeignKey(Profile,
                                 on_delete=models.CASCADE,
                                 related_name='orders')
@@ -40,4 +51,16 @@ class Order(TimeStampMixin, models.Model):
                                       decimal_places=2,
                                       validators=[MinValueValidator(0.01)])
     is_completed = models.BooleanField(default=False)
+    item_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = CustomOrderManager()
+
+    maintained_counters = ('item_count',)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['item_count'], condition=models.Q(is_completed=False), name='order_open_item_count_idx'),
+            # The open-order queue that complete_order() and drain_orders claim from, oldest first.
+            models.Index(fields=['creation_date', 'id'], condition=models.Q(is_completed=False),
+                         name='order_open_queue_idx'),
+        ]
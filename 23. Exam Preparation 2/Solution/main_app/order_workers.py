@@ -0,0 +1,152 @@
+import signal
+import time
+
+# Runs in spawned worker processes, so Django is set up in each worker before any model import.
+
+RETRYABLE_SQLSTATES = {
+    '55P03': 'lock',  # lock_not_available, raised by lock_timeout
+    '40P01': 'conflict',  # deadlock_detected
+    '40001': 'conflict',  # serialization_failure
+}
+
+
+def retry_reason(error):
+    cause = error.__cause__
+    sqlstate = getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)
+    if sqlstate in RETRYABLE_SQLSTATES:
+        return RETRYABLE_SQLSTATES[sqlstate]
+
+    if 'database is locked' in str(error):
+        return 'lock'
+
+    return None
+
+
+def _process_batch(batch_size, lock_timeout_ms, dry_run, skipped=()):
+    from django.db import DatabaseError, OperationalError, connection, transaction
+
+    from main_app.models import Order
+
+    def complete(order_ids):
+        # A savepoint each, so a failure rolls back only these orders. Retryable errors retry the whole batch.
+        try:
+            with transaction.atomic():
+                Order.objects.complete(order_ids)
+        except DatabaseError as error:
+            if isinstance(error, OperationalError) and retry_reason(error):
+                raise
+            return error
+        return None
+
+    completed, failed = 0, {}
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'SET LOCAL lock_timeout = {int(lock_timeout_ms)}')
+
+        order_ids = Order.objects.claim_open(batch_size, exclude=skipped)
+        if complete(order_ids) is None:
+            completed = len(order_ids)
+        else:
+            # Find the orders that fail one by one; the rest of the batch still commits.
+            for order_id in order_ids:
+                error = complete([order_id])
+                if error is None:
+                    completed += 1
+                else:
+                    failed[order_id] = str(error)
+
+        if dry_run:
+            transaction.set_rollback(True)
+
+    return len(order_ids), completed, failed
+
+
+def new_stats(number) -> dict:
+    return {'worker': number, 'orders': 0, 'batches': 0, 'retries': 0, 'lock_waits': 0, 'failed_orders': {},
+            'error': None, 'seconds': 0.0}
+
+
+def run_worker(number, options, stop, claimed, results):
+    # Ctrl+C reaches the whole process group and a service manager may signal every process;
+    # the parent turns both into `stop` so that every worker finishes the batch it is in the
+    # middle of and still reports before exiting.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    import django
+
+    django.setup()
+
+    from django.db import DatabaseError, OperationalError, connection
+
+    stats = new_stats(number)
+    started = time.perf_counter()
+
+    try:
+        while not stop.is_set():
+            if options['limit'] is not None:
+                with claimed.get_lock():
+                    if claimed.value >= options['limit']:
+                        break
+                    batch_size = min(options['batch_size'], options['limit'] - claimed.value)
+                    claimed.value += batch_size
+            else:
+                batch_size = options['batch_size']
+
+            result = None
+            for attempt in range(options['max_retries'] + 1):
+                try:
+                    result = _process_batch(batch_size, options['lock_timeout'], options['dry_run'],
+                                            stats['failed_orders'])
+                    break
+                except DatabaseError as error:
+                    reason = retry_reason(error) if isinstance(error, OperationalError) else None
+                    if reason is None or attempt == options['max_retries']:
+                        stats['error'] = str(error)
+                        break
+
+                    stats['retries'] += 1
+                    stats['lock_waits'] += reason == 'lock'
+                    time.sleep(min(0.05 * 2 ** attempt, 1))
+
+            # The claim itself failed, or a batch kept hitting locks past --max-retries.
+            if result is None:
+                break
+
+            num_claimed, completed, failed = result
+            stats['batches'] += 1
+            stats['orders'] += completed
+            # Orders that failed stay open; this worker leaves them out of its later claims.
+            stats['failed_orders'].update(failed)
+
+            # An empty claim means the backlog is drained (or locked by the other workers);
+            # a dry run rolls its batch back, so claiming again would only see the same orders.
+            if not num_claimed or options['dry_run']:
+                break
+    except Exception as error:
+        stats['error'] = str(error)
+        raise
+    finally:
+        stats['seconds'] = time.perf_counter() - started
+        results.put(stats)
+        connection.close()
+
+
+def setup_backfill_worker():
+    import django
+
+    django.setup()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def backfill_order_counts(bounds):
+    from django.db import transaction
+
+    from main_app.models import Profile
+
+    start, end = bounds
+    with transaction.atomic():
+        return Profile.objects.rebuild_order_counts(
+            Profile.objects.filter(pk__gte=start, pk__lt=end).values('pk')
+        )
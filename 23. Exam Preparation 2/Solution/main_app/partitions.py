@@ -0,0 +1,123 @@
+import json
+import re
+from datetime import date, datetime, timezone
+
+from django.db import connection
+
+# PostgreSQL only: main_app_order is range partitioned by month on creation_date (migration 0007).
+PARENT_TABLE = 'main_app_order'
+ORDER_PRODUCTS_TABLE = 'main_app_order_products'
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+# The table as it was before partitioning: every order created before the first monthly partition.
+LEGACY_PARTITION = f'{PARENT_TABLE}_legacy'
+MONTHLY_PARTITION = re.compile(rf'^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$')
+
+
+def month_start(day) -> date:
+    return date(day.year, day.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bound(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: date) -> str:
+    return f'{PARENT_TABLE}_p{month:%Y%m}'
+
+
+def is_partitioned(cursor) -> bool:
+    cursor.execute(
+        'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))',
+        [PARENT_TABLE],
+    )
+    return cursor.fetchone()[0]
+
+
+def monthly_partitions(cursor) -> dict:
+    cursor.execute(
+        'SELECT child.relname FROM pg_inherits '
+        'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent '
+        'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+        'WHERE parent.relname = %s',
+        [PARENT_TABLE],
+    )
+
+    partitions = {}
+    for name, in cursor.fetchall():
+        if match := MONTHLY_PARTITION.match(name):
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+
+    return partitions
+
+
+def legacy_end(cursor):
+    # The month the legacy partition ends at, or None when it does not exist (any more).
+    cursor.execute(
+        "SELECT substring(pg_get_expr(relpartbound, oid) FROM 'TO \\(''(\\d{4}-\\d{2})-01') "
+        'FROM pg_class WHERE oid = to_regclass(%s) AND relispartition',
+        [LEGACY_PARTITION],
+    )
+    row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    year, month = row[0].split('-')
+    return date(int(year), int(month), 1)
+
+
+def create_partition(cursor, month: date):
+    # Bounds are UTC midnights, matching the timestamps Django stores with USE_TZ.
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(partition_name(month))} '
+        f'PARTITION OF {connection.ops.quote_name(PARENT_TABLE)} '
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def detach_partition(cursor, name: str, drop: bool = False) -> int:
+    # main_app_order_products.order_id has no foreign key to cascade through (see migration 0007),
+    # so the product links of the partition's orders leave with it: kept in <partition>_products
+    # next to a detached partition, deleted along with a dropped one. Returns how many links moved.
+    quote_name = connection.ops.quote_name
+    links = f'FROM {quote_name(ORDER_PRODUCTS_TABLE)} WHERE order_id IN (SELECT id FROM {quote_name(name)})'
+    if not drop:
+        cursor.execute(f'CREATE TABLE {quote_name(f"{name}_products")} AS SELECT * {links}')
+    cursor.execute(f'DELETE {links}')
+    num_links = cursor.rowcount
+
+    # The orders stop counting towards Profile.order_count as well.
+    cursor.execute(f'UPDATE main_app_profile SET order_count = order_count - detached.num '
+                   f'FROM (SELECT profile_id, COUNT(*) AS num FROM {quote_name(name)} GROUP BY profile_id) detached '
+                   f'WHERE main_app_profile.id = detached.profile_id')
+
+    # Not CONCURRENTLY: PostgreSQL refuses that while a default partition exists.
+    cursor.execute(f'ALTER TABLE {quote_name(PARENT_TABLE)} DETACH PARTITION {quote_name(name)}')
+    if drop:
+        cursor.execute(f'DROP TABLE {quote_name(name)}')
+
+    return num_links
+
+
+def scanned_partitions(queryset) -> list:
+    # The partitions left in the plan after pruning at planning time.
+    with connection.cursor() as cursor:
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    names, nodes = [], [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        name = node.get('Relation Name', '')
+        if name in (DEFAULT_PARTITION, LEGACY_PARTITION) or MONTHLY_PARTITION.match(name):
+            names.append(name)
+        nodes.extend(node.get('Plans', []))
+
+    return sorted(set(names))
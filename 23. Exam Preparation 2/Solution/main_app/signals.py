@@ -0,0 +1,75 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from main_app.models import Order, Product, Profile
+
+
+@receiver(m2m_changed, sender=Order.products.through)
+def count_order_items(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_order_ids = list(instance.orders.values_list('pk', flat=True))
+        return
+
+    if action == 'post_clear':
+        if reverse:
+            Order.objects.adjust_item_counts(instance._cleared_order_ids, -1)
+        else:
+            Order.objects.filter(pk=instance.pk).update(item_count=0)
+        return
+
+    if action == 'pre_remove':
+        # pk_set holds whatever the caller passed to remove(), including rows that are not linked.
+        linked = instance.orders if reverse else instance.products
+        instance._removed_pks = set(linked.filter(pk__in=pk_set).values_list('pk', flat=True))
+        return
+
+    if action == 'post_remove':
+        pk_set = instance._removed_pks
+
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    sign = 1 if action == 'post_add' else -1
+    if reverse:
+        Order.objects.adjust_item_counts(pk_set, sign)
+    else:
+        Order.objects.adjust_item_counts([instance.pk], sign * len(pk_set))
+
+
+@receiver(pre_delete, sender=Product)
+def remember_product_orders(sender, instance, **kwargs):
+    instance._deleted_order_ids = list(instance.orders.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Product)
+def count_deleted_product(sender, instance, **kwargs):
+    Order.objects.adjust_item_counts(instance._deleted_order_ids, -1)
+
+
+@receiver(pre_save, sender=Order)
+def remember_previous_profile(sender, instance, raw, **kwargs):
+    instance._previous_profile_id = None
+    if not raw and not instance._state.adding:
+        instance._previous_profile_id = Order.objects \
+            .filter(pk=instance.pk) \
+            .values_list('profile_id', flat=True) \
+            .first()
+
+
+@receiver(post_save, sender=Order)
+def count_saved_order(sender, instance, created, raw, **kwargs):
+    # Fixtures (loaddata) save raw and carry Profile.order_count as it was dumped.
+    if raw:
+        return
+
+    if created:
+        Profile.objects.adjust_order_counts([instance.profile_id], 1)
+    elif instance._previous_profile_id != instance.profile_id:
+        Profile.objects.adjust_order_counts([instance._previous_profile_id], -1)
+        Profile.objects.adjust_order_counts([instance.profile_id], 1)
+
+
+@receiver(post_delete, sender=Order)
+def count_deleted_order(sender, instance, **kwargs):
+    Profile.objects.adjust_order_counts([instance.profile_id], -1)
@@ -1,3 +1,166 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core import serializers
+from django.db import IntegrityError
 from django.test import TestCase
 
-# Create your tests here.
+from caller import apply_discounts
+from main_app.models import Order, Product, Profile
+from main_app.order_workers import _process_batch
+
+
+class OrderItemCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = Profile.objects.create(full_name='Test Profile', email='profile@example.com',
+                                             phone_number='0888123456', address='Test Street 1')
+        cls.products = [Product.objects.create(name=f'Product {number}', description='Description.',
+                                               price=Decimal('10.00'), in_stock=5)
+                        for number in range(4)]
+
+    def setUp(self):
+        self.order = Order.objects.create(profile=self.profile, total_price=Decimal('100.00'))
+        self.other = Order.objects.create(profile=self.profile, total_price=Decimal('50.00'))
+
+    def item_counts(self):
+        return list(Order.objects.order_by('pk').values_list('item_count', flat=True))
+
+    def test_item_counts_follow_the_products_relation(self):
+        self.order.products.add(*self.products[:3])
+        self.products[0].orders.add(self.other)
+        self.assertEqual(self.item_counts(), [3, 1])
+
+        self.order.products.remove(self.products[1])
+        self.products[0].orders.clear()
+        self.assertEqual(self.item_counts(), [1, 0])
+
+        self.products[2].delete()
+        self.assertEqual(self.item_counts(), [0, 0])
+
+    def test_removing_products_that_are_not_in_the_order_changes_nothing(self):
+        self.order.products.add(*self.products[:3])
+
+        self.order.products.remove(self.products[0], self.products[3])
+        self.products[1].orders.remove(self.order, self.other)
+        self.order.products.remove(self.products[0])
+        self.assertEqual(self.item_counts(), [1, 0])
+        self.assertEqual(Order.objects.rebuild_item_counts(), 2)
+        self.assertEqual(self.item_counts(), [1, 0])
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        stale = Order.objects.get(pk=self.order.pk)
+        self.order.products.add(*self.products[:3])
+
+        stale.is_completed = True
+        stale.save()
+
+        self.assertEqual(self.item_counts(), [3, 0])
+        self.assertEqual(Profile.objects.get(pk=self.profile.pk).order_count, 2)
+
+    def test_apply_discounts_uses_the_item_count(self):
+        self.order.products.add(*self.products[:3])
+        self.other.products.add(*self.products[:2])
+
+        self.assertEqual(apply_discounts(), 'Discount applied to 1 orders.')
+        self.assertEqual(Order.objects.get(pk=self.order.pk).total_price, Decimal('90.00'))
+
+
+class ProfileOrderCountTests(TestCase):
+    def test_order_counts_follow_creation_moves_and_deletion(self):
+        first, second = [Profile.objects.create(full_name=name, email=f'{name}@example.com', phone_number='0888',
+                                                address='Street') for name in ('first', 'second')]
+        order = Order.objects.create(profile=first, total_price=Decimal('10.00'))
+        Order.objects.create(profile=first, total_price=Decimal('20.00'))
+
+        order.profile = second
+        order.save()
+        self.assertEqual(list(Profile.objects.order_by('pk').values_list('order_count', flat=True)), [1, 1])
+
+        order.delete()
+        self.assertEqual(list(Profile.objects.order_by('pk').values_list('order_count', flat=True)), [1, 0])
+
+    def test_loading_a_fixture_keeps_the_dumped_order_count(self):
+        profile = Profile.objects.create(full_name='Loaded', email='loaded@example.com', phone_number='0888',
+                                         address='Street')
+        Order.objects.create(profile=profile, total_price=Decimal('10.00'))
+        fixture = serializers.serialize('json', [*Profile.objects.all(), *Order.objects.all()])
+        profile.delete()
+
+        # What loaddata does: the rows are saved raw, the profile with order_count already 1.
+        for deserialized in serializers.deserialize('json', fixture):
+            deserialized.save()
+
+        self.assertEqual(Profile.objects.get().order_count, 1)
+
+
+class OrderQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.profile = Profile.objects.create(full_name='Queue Profile', email='queue@example.com',
+                                             phone_number='0888123456', address='Queue Street 1')
+
+    def setUp(self):
+        self.shared = Product.objects.create(name='Shared', description='Description.', price=Decimal('5.00'),
+                                             in_stock=3)
+        self.single = Product.objects.create(name='Single', description='Description.', price=Decimal('5.00'),
+                                             in_stock=1)
+        self.orders = [Order.objects.create(profile=self.profile, total_price=Decimal('10.00')) for _ in range(3)]
+        for order in self.orders:
+            order.products.add(self.shared)
+        self.orders[0].products.add(self.single)
+
+    def stock(self):
+        return list(Product.objects.order_by('pk').values_list('in_stock', 'is_available'))
+
+    def test_claim_open_returns_the_oldest_open_orders(self):
+        Order.objects.filter(pk=self.orders[0].pk).update(is_completed=True)
+
+        self.assertEqual(Order.objects.claim_open(), [self.orders[1].pk])
+        self.assertEqual(Order.objects.claim_open(5), [self.orders[1].pk, self.orders[2].pk])
+
+    def test_complete_takes_one_unit_per_order_of_a_shared_product(self):
+        self.assertEqual(Order.objects.complete([order.pk for order in self.orders[:2]]), 2)
+
+        self.assertEqual(self.stock(), [(1, True), (0, False)])
+        self.assertEqual(list(Order.objects.order_by('pk').values_list('is_completed', flat=True)),
+                         [True, True, False])
+
+        self.assertEqual(Order.objects.complete([self.orders[2].pk]), 1)
+        self.assertEqual(self.stock(), [(0, False), (0, False)])
+
+    def test_complete_next_moves_past_orders_whose_products_are_out_of_stock(self):
+        Product.objects.update(in_stock=0, is_available=False)
+
+        self.assertEqual(Order.objects.complete_next(), [self.orders[0].pk])
+        self.assertEqual(Order.objects.complete_next(2), [self.orders[1].pk, self.orders[2].pk])
+        self.assertEqual(Order.objects.complete_next(), [])
+        self.assertEqual(self.stock(), [(0, False), (0, False)])
+
+
+class ProcessBatchTests(TestCase):
+    def setUp(self):
+        profile = Profile.objects.create(full_name='Batch Profile', email='batch@example.com',
+                                         phone_number='0888123456', address='Batch Street 1')
+        self.orders = [Order.objects.create(profile=profile, total_price=Decimal('10.00')) for _ in range(3)]
+
+    def test_an_order_that_fails_is_skipped_and_the_rest_commit(self):
+        bad_order_id = self.orders[0].pk
+        complete = Order.objects.complete
+
+        def failing_complete(order_ids):
+            if bad_order_id in order_ids:
+                raise IntegrityError('CHECK constraint failed')
+            return complete(order_ids)
+
+        with mock.patch.object(Order.objects, 'complete', side_effect=failing_complete):
+            num_claimed, completed, failed = _process_batch(5, 2000, False)
+            self.assertEqual((num_claimed, completed, list(failed)), (3, 2, [bad_order_id]))
+            self.assertEqual(list(Order.objects.order_by('pk').values_list('is_completed', flat=True)),
+                             [False, True, True])
+
+            self.assertEqual(_process_batch(5, 2000, False, skipped=failed), (0, 0, {}))
+
+    def test_dry_run_rolls_the_batch_back(self):
+        self.assertEqual(_process_batch(2, 2000, True)[:2], (2, 2))
+        self.assertFalse(Order.objects.filter(is_completed=True).exists())
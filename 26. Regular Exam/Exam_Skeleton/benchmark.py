@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import time
+import django
+
+# Set up Django
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "orm_skeleton.settings")
+django.setup()
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+import caller
+from main_app.models import Article, Author, Review
+
+
+def rows_scanned():
+    # pg_stat_xact_* is updated immediately for the current transaction,
+    # unlike pg_stat_user_tables which lags behind the stats collector.
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT COALESCE(SUM(seq_tup_read + COALESCE(idx_tup_fetch, 0)), 0) '
+            'FROM pg_stat_xact_user_tables'
+        )
+        # SUM over bigint columns comes back as a Decimal.
+        return int(cursor.fetchone()[0])
+
+
+def measure(function, args_for_run, repeat):
+    timings, query_counts, scanned = [], [], []
+
+    for run in range(repeat):
+        with transaction.atomic():
+            scanned_before = rows_scanned()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                function(*args_for_run(run))
+                timings.append(time.perf_counter() - started)
+            scanned_after = rows_scanned()
+            # Every run starts from the same data, however much the function writes.
+            transaction.set_rollback(True)
+
+        query_counts.append(len(queries.captured_queries))
+        if scanned_before is not None:
+            scanned.append(scanned_after - scanned_before)
+
+    return {
+        'runs': repeat,
+        'min_ms': min(timings) * 1000,
+        'median_ms': statistics.median(timings) * 1000,
+        'mean_ms': statistics.mean(timings) * 1000,
+        'queries': max(query_counts),
+        'rows_scanned': max(scanned) if scanned else None,
+    }
+
+
+def benchmarks():
+    ban_emails = list(
+        Author.objects.filter(is_banned=False, review__isnull=False)
+            .order_by('email')
+            .values_list('email', flat=True)
+            .distinct()[:100]
+    )
+
+    functions = {
+        'get_authors': (caller.get_authors, lambda run: ('Author 1', None)),
+        'get_top_publisher': (caller.get_top_publisher, lambda run: ()),
+        'get_top_reviewer': (caller.get_top_reviewer, lambda run: ()),
+        'get_latest_article': (caller.get_latest_article, lambda run: ()),
+        'get_top_rated_article': (caller.get_top_rated_article, lambda run: ()),
+    }
+    if ban_emails:
+        # Bans a different author on every run; each ban is rolled back with its run.
+        functions['ban_author'] = (caller.ban_author, lambda run: (ban_emails[run % len(ban_emails)],))
+
+    return functions
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measures the caller.py functions and prints the results as JSON.')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='Also write the JSON report to this file.')
+    parser.add_argument('--skip', nargs='*', default=[], help='Names of functions to leave out.')
+    args = parser.parse_args()
+
+    report = {
+        'commit': current_commit(),
+        'vendor': connection.vendor,
+        'scale': {
+            'authors': Author.objects.count(),
+            'articles': Article.objects.count(),
+            'reviews': Review.objects.count(),
+        },
+        'results': {},
+    }
+
+    for name, (function, args_for_run) in benchmarks().items():
+        if name not in args.skip:
+            report['results'][name] = measure(function, args_for_run, args.repeat)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as stream:
+            stream.write(output)
@@ -1,115 +1,94 @@
 import os
 import django
-from django.db import models
-from django.db.models import Q, Count, Avg
 
-from main_app.models import Author, Article, Review
+from main_app.models import Author, Article, ArticleStats
 
 # Set up Django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "orm_skeleton.settings")
 django.setup()
 
-def get_authors(search_name=None, search_email=None):
+# Reporters stream rows with .iterator(), which uses named server-side cursors on
+# Postgres, and fetch only the columns they print.
+REPORT_CHUNK_SIZE = 2000
+
+
+def iter_authors(search_name=None, search_email=None, chunk_size=REPORT_CHUNK_SIZE):
     if search_name is None and search_email is None:
-        return ''
-
-    query = Q()
-    query_name = Q(full_name__icontains=search_name)
-    query_email = Q(email__icontains=search_email)
-    if search_name is not None and search_email is None:
-        query |= query_name
-    elif search_name is None and search_email is not None:
-        query |= query_email
-    else:
-        query |= query_name & query_email
-    authors = Author.objects.filter(query).order_by('-full_name')
-    if not authors:
-        return ''
-    result = []
-    for author in authors:
-        status = 'Banned' if author.is_banned else 'Not Banned'
-        result.append(
-            f"Author: {author.full_name}, email: {author.email}, status: {status}")
-    return '\n'.join(result)
+        return
 
+    authors = Author.objects.search(full_name=search_name, email=search_email) \
+        .order_by('-full_name') \
+        .values_list('full_name', 'email', 'is_banned')
 
-def get_top_publisher():
+    for full_name, email, is_banned in authors.iterator(chunk_size=chunk_size):
+        status = 'Banned' if is_banned else 'Not Banned'
+        yield f"Author: {full_name}, email: {email}, status: {status}"
 
-    authors_with_article_count = Author.objects.annotate(num_articles=models.Count('article'))
 
-    authors_with_articles = authors_with_article_count.filter(num_articles__gt=0)
+def get_authors(search_name=None, search_email=None):
+    return '\n'.join(iter_authors(search_name, search_email))
 
-    top_publisher = authors_with_articles.order_by('-num_articles', 'email').first()
 
-    if top_publisher:
-        return f"Top Author: {top_publisher.full_name} with {top_publisher.num_articles} published articles."
-    else:
-        return ""
+def iter_top_publisher():
+    top_publisher = Author.objects.top_publishers().values_list('full_name', 'num_articles')
+
+    for full_name, num_articles in top_publisher.iterator():
+        yield f"Top Author: {full_name} with {num_articles} published articles."
 
-def get_top_reviewer():
 
-    authors_with_review_count = Author.objects.annotate(num_reviews=models.Count('review'))
+def get_top_publisher():
+    return '\n'.join(iter_top_publisher())
 
-    authors_with_reviews = authors_with_review_count.filter(num_reviews__gt=0)
 
-    top_reviewer = authors_with_reviews.order_by('-num_reviews', 'email').first()
+def iter_top_reviewer():
+    top_reviewer = Author.objects.top_reviewers().values_list('full_name', 'num_reviews')
 
-    if top_reviewer:
-        return f"Top Reviewer: {top_reviewer.full_name} with {top_reviewer.num_reviews} published reviews."
-    else:
-        return ""
+    for full_name, num_reviews in top_reviewer.iterator():
+        yield f"Top Reviewer: {full_name} with {num_reviews} published reviews."
 
-def get_latest_article():
-    latest_article = Article.objects.order_by('-published_on').first()
 
-    if not latest_article:
-        return ""
+def get_top_reviewer():
+    return '\n'.join(iter_top_reviewer())
 
-    authors = latest_article.authors.all().order_by('full_name')
-    author_names = ", ".join([author.full_name for author in authors])
 
-    num_reviews = Review.objects.filter(article=latest_article).count()
-    avg_rating = Review.objects.filter(article=latest_article).aggregate(avg_rating=models.Avg('rating'))['avg_rating']
+def iter_latest_article():
+    latest_article = Article.objects \
+        .order_by('-published_on') \
+        .values_list('pk', 'title', 'stats__review_count', 'stats__avg_rating')[:1]
 
-    formatted_avg_rating = "{:.2f}".format(avg_rating) if avg_rating is not None else "0.00"
+    for pk, title, num_reviews, avg_rating in latest_article.iterator():
+        authors = Author.objects.filter(article=pk).order_by('full_name').values_list('full_name', flat=True)
+        author_names = ", ".join(authors.iterator())
 
-    return f"The latest article is: {latest_article.title}. Authors: {author_names}. Reviewed: {num_reviews} times. Average Rating: {formatted_avg_rating}."
+        # An article without an ArticleStats row has no reviews yet.
+        formatted_avg_rating = "{:.2f}".format(avg_rating or 0.0)
 
+        yield f"The latest article is: {title}. Authors: {author_names}. Reviewed: {num_reviews or 0} times. Average Rating: {formatted_avg_rating}."
 
-def get_top_rated_article():
 
-    articles_with_ratings = Article.objects.annotate(
-        avg_rating=models.Avg('review__rating'),
-        num_reviews=models.Count('review')
-    )
+def get_latest_article():
+    return '\n'.join(iter_latest_article())
 
-    articles_with_reviews = articles_with_ratings.filter(num_reviews__gt=0)
 
-    top_rated_article = articles_with_reviews.order_by('-avg_rating', 'title').first()
+def iter_top_rated_article():
+    top_rated = ArticleStats.objects.top_rated().values_list('article__title', 'avg_rating', 'review_count')
 
-    if top_rated_article:
+    for title, avg_rating, num_reviews in top_rated.iterator():
+        formatted_avg_rating = "{:.2f}".format(avg_rating)
+        yield f"The top-rated article is: {title}, with an average rating of {formatted_avg_rating}, reviewed {num_reviews} times."
 
-        formatted_avg_rating = "{:.2f}".format(top_rated_article.avg_rating)
-        return f"The top-rated article is: {top_rated_article.title}, with an average rating of {formatted_avg_rating}, reviewed {top_rated_article.num_reviews} times."
-    else:
-        return ""
+
+def get_top_rated_article():
+    return '\n'.join(iter_top_rated_article())
 
 
 def ban_author(email=None):
     if email is None:
         return "No authors banned."
 
-    author_to_ban = Author.objects.filter(email=email).first()
+    banned, num_reviews = Author.objects.ban([email])
 
-    if author_to_ban is None:
+    if not banned:
         return "No authors banned."
 
-    num_reviews = Review.objects.filter(author=author_to_ban).count()
-
-    Review.objects.filter(author=author_to_ban).delete()
-
-    author_to_ban.is_banned = True
-    author_to_ban.save()
-
-    return f"Author: {author_to_ban.full_name} is banned! {num_reviews} reviews deleted."
-
+    return f"Author: {banned[0]} is banned! {num_reviews} reviews deleted."
@@ -0,0 +1,104 @@
+import argparse
+import os
+import django
+
+# Set up Django
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "orm_skeleton.settings")
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Avg, Count
+
+from main_app.models import Article, Review
+from main_app.seeding import seed
+
+BENCHMARKED_INDEXES = ('article_published_idx', 'review_article_rating_idx', 'review_author_published_idx')
+
+
+def benchmarked_indexes():
+    return [
+        (model, index)
+        for model in (Article, Review)
+        for index in model._meta.indexes
+        if index.name in BENCHMARKED_INDEXES
+    ]
+
+
+def indexed_queries():
+    article_id, author_id = Review.objects.values_list('article_id', 'author_id').first()
+
+    return {
+        'latest article': Article.objects.order_by('-published_on')[:1],
+        'article rating aggregate': Review.objects
+            .filter(article_id=article_id)
+            .values('article_id')
+            .annotate(num_reviews=Count('pk'), avg_rating=Avg('rating')),
+        'author review history': Review.objects
+            .filter(author_id=author_id)
+            .order_by('-published_on')[:20],
+    }
+
+
+def drop_benchmarked_indexes():
+    with connection.schema_editor() as schema_editor:
+        for model, index in benchmarked_indexes():
+            schema_editor.remove_index(model, index)
+
+
+def create_benchmarked_indexes():
+    with connection.schema_editor() as schema_editor:
+        for model, index in benchmarked_indexes():
+            schema_editor.add_index(model, index)
+
+
+def explain_before_and_after():
+    if connection.vendor == 'postgresql':
+        # DDL is transactional here, so the whole comparison is rolled back: the indexes are back
+        # even if a step fails, and no other session sees them missing. The tables stay locked
+        # until the rollback, though.
+        with transaction.atomic():
+            drop_benchmarked_indexes()
+            explain_all('before')
+            create_benchmarked_indexes()
+            explain_all('after')
+            transaction.set_rollback(True)
+        return
+
+    drop_benchmarked_indexes()
+    try:
+        explain_all('before')
+    finally:
+        create_benchmarked_indexes()
+    explain_all('after')
+
+
+def explain_all(label):
+    options = {}
+    if connection.vendor == 'postgresql':
+        options = {'analyze': True, 'buffers': True}
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    print(f'===== {label} =====')
+    for name, queryset in indexed_queries().items():
+        print(f'--- {name}')
+        print(queryset.explain(**options))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='EXPLAIN the Review/Article queries with and without '
+                                                 'their composite indexes. Locks the tables while it runs, '
+                                                 'so point it at a scratch database.')
+    parser.add_argument('--seed', nargs=3, type=int, metavar=('AUTHORS', 'ARTICLES', 'REVIEWS'),
+                        help='Seed an empty database with this many rows first.')
+    args = parser.parse_args()
+
+    call_command('migrate', verbosity=0)
+    if args.seed:
+        seed(*args.seed)
+
+    if not Review.objects.exists():
+        parser.error('There are no reviews to explain, run with --seed first.')
+
+    explain_before_and_after()
@@ -0,0 +1,86 @@
+import csv
+import json
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from main_app.models import Article
+
+EXPORT_FIELDS = ('id', 'title', 'content', 'category', 'published_on', 'authors', 'review_count', 'avg_rating')
+
+
+def iter_article_chunks(chunk_size: int = 1000):
+    # Keyset pagination over (published_on, id): every chunk is a bounded index range
+    # scan, no matter how deep into the table the export is.
+    last_key = None
+
+    while True:
+        articles = Article.objects \
+            .order_by('published_on', 'pk') \
+            .values_list('pk', 'title', 'content', 'category', 'published_on',
+                         'stats__review_count', 'stats__avg_rating')
+
+        if last_key is not None:
+            published_on, pk = last_key
+            articles = articles.filter(Q(published_on__gt=published_on) | Q(published_on=published_on, pk__gt=pk))
+
+        rows = list(articles[:chunk_size])
+        if not rows:
+            return
+
+        authors = defaultdict(list)
+        article_authors = Article.authors.through.objects \
+            .filter(article_id__in=[row[0] for row in rows]) \
+            .order_by('author__full_name') \
+            .values_list('article_id', 'author__full_name')
+        for article_id, full_name in article_authors:
+            authors[article_id].append(full_name)
+
+        yield [
+            {
+                'id': pk,
+                'title': title,
+                'content': content,
+                'category': category,
+                'published_on': published_on,
+                'authors': authors[pk],
+                'review_count': review_count or 0,
+                'avg_rating': avg_rating or 0.0,
+            }
+            for pk, title, content, category, published_on, review_count, avg_rating in rows
+        ]
+
+        last_key = (rows[-1][4], rows[-1][0])
+
+
+def iter_articles(chunk_size: int = 1000):
+    for chunk in iter_article_chunks(chunk_size):
+        yield from chunk
+
+
+def write_ndjson(stream, articles) -> int:
+    written = 0
+    for article in articles:
+        stream.write(json.dumps(article, cls=DjangoJSONEncoder) + '\n')
+        written += 1
+
+    return written
+
+
+def write_csv(stream, articles) -> int:
+    writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+
+    written = 0
+    for article in articles:
+        writer.writerow({**article, 'authors': '; '.join(article['authors'])})
+        written += 1
+
+    return written
+
+
+WRITERS = {
+    'ndjson': write_ndjson,
+    'csv': write_csv,
+}
@@ -0,0 +1,26 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from main_app.exports import WRITERS, iter_articles
+
+
+class Command(BaseCommand):
+    help = 'Streams every article with its authors and review statistics as NDJSON or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(WRITERS), default='ndjson')
+        parser.add_argument('--output', help='File to write to. Defaults to stdout.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        write = WRITERS[options['format']]
+        articles = iter_articles(chunk_size=options['chunk_size'])
+
+        if options['output'] is None:
+            written = write(sys.stdout, articles)
+        else:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as stream:
+                written = write(stream, articles)
+
+        self.stderr.write(f'Exported {written} articles.')
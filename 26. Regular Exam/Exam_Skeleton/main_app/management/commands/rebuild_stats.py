@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main_app.models import ArticleStats, AuthorStats
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized author and article statistics from the source tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            choices=('authors', 'articles'),
+            help='Rebuild just one of the statistics tables.',
+        )
+
+    def handle(self, *args, **options):
+        only = options['only']
+
+        with transaction.atomic():
+            if only in (None, 'authors'):
+                rows = AuthorStats.objects.rebuild()
+                self.stdout.write(f'Rebuilt statistics for {rows} authors.')
+
+            if only in (None, 'articles'):
+                rows = ArticleStats.objects.rebuild()
+                self.stdout.write(f'Rebuilt statistics for {rows} articles.')
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main_app.models import Author
+from main_app.seeding import seed
+
+
+class Command(BaseCommand):
+    help = 'Bulk-loads a reproducible dataset of authors, articles and reviews for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--authors', type=int, default=100_000)
+        parser.add_argument('--articles', type=int, default=1_000_000)
+        parser.add_argument('--reviews', type=int, default=10_000_000)
+        parser.add_argument('--authors-per-article', type=int, default=2)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--random-seed', type=int, default=0)
+        parser.add_argument('--copy', action='store_true', help='Load with COPY (PostgreSQL only).')
+
+    def handle(self, *args, **options):
+        if Author.objects.exists():
+            raise CommandError('The database already has authors, seed_benchmark needs empty tables.')
+
+        started = time.perf_counter()
+        try:
+            seed(
+                options['authors'],
+                options['articles'],
+                options['reviews'],
+                authors_per_article=options['authors_per_article'],
+                batch_size=options['batch_size'],
+                random_seed=options['random_seed'],
+                use_copy=options['copy'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.stdout.write(
+            f"Seeded {options['authors']} authors, {options['articles']} articles and "
+            f"{options['reviews']} reviews in {time.perf_counter() - started:.1f}s."
+        )
@@ -1,7 +1,215 @@
-from django.db import models
-from django.db.models import Count
+import time
+from itertools import islice
+from typing import Iterable
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
 
 
 class AuthorManager(models.Manager):
     def get_authors_by_article_count(self):
         return self.annotate(num_of_article=Count('article')).order_by('-num_of_article', 'email')
+
+    def search(self, full_name=None, email=None):
+        query = Q()
+        if full_name is not None:
+            query &= Q(full_name__icontains=full_name)
+        if email is not None:
+            query &= Q(email__icontains=email)
+
+        return self.filter(query)
+
+    def top_publishers(self, limit: int = 1):
+        return self.filter(stats__article_count__gt=0) \
+                   .annotate(num_articles=F('stats__article_count')) \
+                   .order_by('-stats__article_count', 'email')[:limit]
+
+    def top_reviewers(self, limit: int = 1):
+        return self.filter(stats__review_count__gt=0) \
+                   .annotate(num_reviews=F('stats__review_count')) \
+                   .order_by('-stats__review_count', 'email')[:limit]
+
+    def ban(self, emails: Iterable[str]):
+        from main_app.models import ArticleStats, AuthorStats, Review
+
+        with transaction.atomic(using=self.db):
+            banned = list(
+                self.filter(email__in=set(emails))
+                    .select_for_update()
+                    .values_list('pk', 'full_name')
+            )
+            if not banned:
+                return [], 0
+
+            author_ids = [pk for pk, _ in banned]
+            reviews = Review.objects.filter(author_id__in=author_ids)
+            article_ids = list(reviews.values_list('article_id', flat=True).distinct())
+
+            # Nothing references Review, so skip the collector and its per-row signals
+            # and keep the statistics in step with set-based updates instead.
+            num_deleted = reviews._raw_delete(reviews.db)
+
+            self.filter(pk__in=author_ids).update(is_banned=True)
+            AuthorStats.objects.filter(author_id__in=author_ids).update(review_count=0)
+            if article_ids:
+                ArticleStats.objects.rebuild(article_ids)
+
+        return [full_name for _, full_name in banned], num_deleted
+
+
+class AuthorStatsManager(models.Manager):
+    def adjust(self, author_ids, field: str, delta: int) -> int:
+        if not author_ids or not delta:
+            return 0
+
+        return self.filter(author_id__in=author_ids).update(**{field: F(field) + delta})
+
+    def rebuild(self, author_ids=None) -> int:
+        from main_app.models import Article, Author, Review
+
+        authors = Author.objects.filter(stats__isnull=True)
+        if author_ids is not None:
+            authors = authors.filter(pk__in=author_ids)
+
+        self.bulk_create(
+            [self.model(author_id=pk) for pk in authors.values_list('pk', flat=True).iterator()],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+        article_count = Article.authors.through.objects \
+            .filter(author_id=OuterRef('author_id')) \
+            .values('author_id') \
+            .annotate(num=Count('pk')) \
+            .values('num')
+        review_count = Review.objects \
+            .filter(author_id=OuterRef('author_id')) \
+            .values('author_id') \
+            .annotate(num=Count('pk')) \
+            .values('num')
+
+        stats = self.all() if author_ids is None else self.filter(author_id__in=author_ids)
+        return stats.update(
+            article_count=Coalesce(Subquery(article_count), 0),
+            review_count=Coalesce(Subquery(review_count), 0),
+        )
+
+
+class ArticleStatsManager(models.Manager):
+    def top_rated(self, limit: int = 1):
+        return self.select_related('article') \
+                   .filter(review_count__gt=0) \
+                   .order_by('-avg_rating', 'article__title')[:limit]
+
+    def apply(self, article_id, count_delta: int, rating_delta: float) -> int:
+        review_count = F('review_count') + count_delta
+        rating_sum = F('rating_sum') + rating_delta
+
+        return self.filter(article_id=article_id).update(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            avg_rating=Coalesce(rating_sum / NullIf(review_count, 0), Value(0.0)),
+        )
+
+    def rebuild(self, article_ids=None) -> int:
+        from main_app.models import Article, Review
+
+        articles = Article.objects.filter(stats__isnull=True)
+        if article_ids is not None:
+            articles = articles.filter(pk__in=article_ids)
+
+        self.bulk_create(
+            [self.model(article_id=pk) for pk in articles.values_list('pk', flat=True).iterator()],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+        reviews = Review.objects \
+            .filter(article_id=OuterRef('article_id')) \
+            .values('article_id')
+        review_count = Coalesce(Subquery(reviews.annotate(num=Count('pk')).values('num')), 0)
+        rating_sum = Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0.0)
+
+        stats = self.all() if article_ids is None else self.filter(article_id__in=article_ids)
+        return stats.update(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            avg_rating=Coalesce(rating_sum / NullIf(review_count, 0), Value(0.0)),
+        )
+
+
+class ReviewManager(models.Manager):
+    INGESTED_FIELDS = ('content', 'rating')
+
+    def bulk_ingest(self, rows: Iterable[dict], chunk_size: int = 5000, batch_size: int = 1000) -> dict:
+        from main_app.models import Article, ArticleStats, Author, AuthorStats
+
+        started = time.perf_counter()
+        fields = [self.model._meta.get_field(name) for name in self.INGESTED_FIELDS]
+        rows = iter(rows)
+        processed, created, errors = 0, 0, []
+
+        while chunk := list(islice(rows, chunk_size)):
+            author_ids = dict(
+                Author.objects
+                    .filter(email__in={row.get('author_email') for row in chunk})
+                    .values_list('email', 'pk')
+            )
+            # CSV and JSON sources hand the ids over as strings; the lookup and the membership test
+            # both need them as primary key values.
+            requested_article_ids = []
+            for row in chunk:
+                try:
+                    requested_article_ids.append(Article._meta.pk.to_python(row.get('article_id')))
+                except ValidationError:
+                    requested_article_ids.append(None)
+
+            article_ids = set(
+                Article.objects
+                    .filter(pk__in={article_id for article_id in requested_article_ids if article_id is not None})
+                    .values_list('pk', flat=True)
+            )
+
+            reviews = []
+            for index, (row, article_id) in enumerate(zip(chunk, requested_article_ids), start=processed):
+                values, row_errors = {}, {}
+
+                # The same checks full_clean() runs, field by field, without a model instance per row.
+                for field in fields:
+                    try:
+                        values[field.name] = field.clean(row.get(field.name), None)
+                    except ValidationError as error:
+                        row_errors[field.name] = error.messages
+
+                author_id = author_ids.get(row.get('author_email'))
+                if author_id is None:
+                    row_errors['author_email'] = ['Unknown author email.']
+                if article_id not in article_ids:
+                    row_errors['article_id'] = ['Unknown article.']
+
+                if row_errors:
+                    errors.append((index, row_errors))
+                    continue
+
+                reviews.append(self.model(author_id=author_id, article_id=article_id, **values))
+
+            with transaction.atomic(using=self.db):
+                self.bulk_create(reviews, batch_size=batch_size)
+                # bulk_create() skips the signal handlers, so refresh the touched counters set-based.
+                if reviews:
+                    AuthorStats.objects.rebuild({review.author_id for review in reviews})
+                    ArticleStats.objects.rebuild({review.article_id for review in reviews})
+
+            processed += len(chunk)
+            created += len(reviews)
+
+        elapsed = time.perf_counter() - started
+        return {
+            'processed': processed,
+            'created': created,
+            'errors': errors,
+            'seconds': elapsed,
+            'rows_per_second': processed / elapsed if elapsed else 0.0,
+        }
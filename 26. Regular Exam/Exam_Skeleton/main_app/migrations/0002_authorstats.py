@@ -0,0 +1,56 @@
+# Generated by Django 4.2.4 on 2026-10-18 17:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_author_stats(apps, schema_editor):
+    Author = apps.get_model('main_app', 'Author')
+    Article = apps.get_model('main_app', 'Article')
+    Review = apps.get_model('main_app', 'Review')
+    AuthorStats = apps.get_model('main_app', 'AuthorStats')
+
+    AuthorStats.objects.bulk_create(
+        [AuthorStats(author_id=pk) for pk in Author.objects.values_list('pk', flat=True).iterator()],
+        batch_size=1000,
+    )
+
+    article_count = Article.authors.through.objects \
+        .filter(author_id=OuterRef('author_id')) \
+        .values('author_id') \
+        .annotate(num=Count('pk')) \
+        .values('num')
+    review_count = Review.objects \
+        .filter(author_id=OuterRef('author_id')) \
+        .values('author_id') \
+        .annotate(num=Count('pk')) \
+        .values('num')
+
+    AuthorStats.objects.update(
+        article_count=Coalesce(Subquery(article_count), 0),
+        review_count=Coalesce(Subquery(review_count), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='main_app.author')),
+                ('article_count', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-article_count'], name='authorstats_articles_idx'), models.Index(fields=['-review_count'], name='authorstats_reviews_idx')],
+            },
+        ),
+        migrations.RunPython(populate_author_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.4 on 2026-10-18 17:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
+
+
+def populate_article_stats(apps, schema_editor):
+    Article = apps.get_model('main_app', 'Article')
+    Review = apps.get_model('main_app', 'Review')
+    ArticleStats = apps.get_model('main_app', 'ArticleStats')
+
+    ArticleStats.objects.bulk_create(
+        [ArticleStats(article_id=pk) for pk in Article.objects.values_list('pk', flat=True).iterator()],
+        batch_size=1000,
+    )
+
+    reviews = Review.objects \
+        .filter(article_id=OuterRef('article_id')) \
+        .values('article_id')
+    review_count = Coalesce(Subquery(reviews.annotate(num=Count('pk')).values('num')), 0)
+    rating_sum = Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0.0)
+
+    ArticleStats.objects.update(
+        review_count=review_count,
+        rating_sum=rating_sum,
+        avg_rating=Coalesce(rating_sum / NullIf(review_count, 0), Value(0.0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0002_authorstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleStats',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='main_app.article')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.FloatField(default=0.0)),
+                ('avg_rating', models.FloatField(default=0.0)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('review_count__gt', 0)), fields=['-avg_rating'], name='articlestats_top_rated_idx')],
+            },
+        ),
+        migrations.RunPython(populate_article_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.4 on 2026-10-18 17:57
+
+from django.db import migrations
+
+# Django compiles `__icontains` on Postgres to `UPPER("col"::text) LIKE UPPER(%s)`,
+# so the GIN trigram indexes are built over that exact expression.
+TRIGRAM_INDEXES = (
+    ('main_app_author_full_name_trgm', 'full_name'),
+    ('main_app_author_email_trgm', 'email'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} '
+            f'ON main_app_author USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for index_name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main_app', '0003_articlestats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -1,7 +1,7 @@
 from django.core.validators import MinLengthValidator, MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
-from main_app.managers import AuthorManager
+from main_app.managers import AuthorManager, AuthorStatsManager, ArticleStatsManager, ReviewManager
 
 
 class Author(models.Model):
@@ -46,6 +46,11 @@ class Article(models.Model):
         editable=False,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['published_on', 'id'], name='article_published_idx'),
+        ]
+
 class Review(models.Model):
     content = models.TextField(
         validators=[MinLengthValidator(10)]
@@ -56,3 +61,57 @@ class Review(models.Model):
     author = models.ForeignKey(to=Author, on_delete=models.CASCADE)     #Many-to-One
     article = models.ForeignKey(to=Article, on_delete=models.CASCADE)           #Many-to-One
     published_on = models.DateTimeField(auto_now_add=True, editable=False)
+
+    objects = ReviewManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['article', 'rating'], name='review_article_rating_idx'),
+            models.Index(fields=['author', 'published_on'], name='review_author_published_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        to=Author,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    article_count = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+
+    objects = AuthorStatsManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-article_count'], name='authorstats_articles_idx'),
+            models.Index(fields=['-review_count'], name='authorstats_reviews_idx'),
+        ]
+
+
+class ArticleStats(models.Model):
+    article = models.OneToOneField(
+        to=Article,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.FloatField(default=0.0)
+    avg_rating = models.FloatField(default=0.0)
+
+    objects = ArticleStatsManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-avg_rating'],
+                condition=models.Q(review_count__gt=0),
+                name='articlestats_top_rated_idx',
+            ),
+        ]
@@ -0,0 +1,105 @@
+import csv
+import io
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main_app.models import Article, ArticleStats, Author, AuthorStats, Review
+
+# Seeded articles and reviews are published over this period, up to the time of seeding.
+PUBLISHING_PERIOD = timedelta(days=365)
+
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+@contextmanager
+def _explicit_timestamps(model, columns):
+    # auto_now_add would replace the seeded values with the time of the insert.
+    fields = [field for field in model._meta.concrete_fields
+              if field.name in columns and getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _bulk_create(model, columns, rows, batch_size):
+    with _explicit_timestamps(model, columns):
+        for batch in _batches(rows, batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    [model(**dict(zip(columns, row))) for row in batch],
+                    batch_size=batch_size,
+                )
+
+
+def _copy(model, columns, rows, batch_size):
+    quote_name = connection.ops.quote_name
+    sql = f'COPY {quote_name(model._meta.db_table)} ({", ".join(quote_name(column) for column in columns)}) ' \
+          f'FROM STDIN WITH (FORMAT csv)'
+
+    with connection.cursor() as cursor:
+        for batch in _batches(rows, batch_size):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(batch)
+
+            driver_cursor = cursor.cursor
+            if hasattr(driver_cursor, 'copy'):
+                with driver_cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+            else:
+                buffer.seek(0)
+                driver_cursor.copy_expert(sql, buffer)
+
+
+def seed(num_authors: int, num_articles: int, num_reviews: int,
+         authors_per_article: int = 2, batch_size: int = 5000, random_seed: int = 0, use_copy: bool = False):
+    # Neither bulk_create() nor COPY fire the signal handlers, so the counters are rebuilt at the end.
+    if use_copy and connection.vendor != 'postgresql':
+        raise ValueError('COPY is only available on PostgreSQL.')
+
+    load = _copy if use_copy else _bulk_create
+    rng = random.Random(random_seed)
+    categories = [choice for choice, _ in Article.CATEGORY_CHOICES]
+    now = timezone.now()
+
+    load(Author, ('full_name', 'email', 'is_banned', 'birth_year'), (
+        (f'Author {i}', f'author{i}@example.com', False, rng.randint(1900, 2005))
+        for i in range(num_authors)
+    ), batch_size)
+    author_ids = list(Author.objects.values_list('pk', flat=True))
+
+    # Articles are published in order at even intervals, so every one has its own timestamp.
+    interval = PUBLISHING_PERIOD / max(num_articles, 1)
+    load(Article, ('title', 'content', 'category', 'published_on'), (
+        (f'Article number {i}', f'Seeded content for article number {i}.', rng.choice(categories),
+         now - (num_articles - 1 - i) * interval)
+        for i in range(num_articles)
+    ), batch_size)
+    article_ids = list(Article.objects.values_list('pk', flat=True))
+
+    load(Article.authors.through, ('article_id', 'author_id'), (
+        (article_id, author_id)
+        for article_id in article_ids
+        for author_id in rng.sample(author_ids, min(authors_per_article, len(author_ids)))
+    ), batch_size)
+
+    load(Review, ('content', 'rating', 'author_id', 'article_id', 'published_on'), (
+        (f'Seeded review number {i}.', rng.randint(1, 5), rng.choice(author_ids), rng.choice(article_ids),
+         now - rng.random() * PUBLISHING_PERIOD)
+        for i in range(num_reviews)
+    ), batch_size)
+
+    AuthorStats.objects.rebuild()
+    ArticleStats.objects.rebuild()
@@ -0,0 +1,103 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from main_app.models import Article, ArticleStats, Author, AuthorStats, Review
+
+
+@receiver(post_save, sender=Author)
+def create_author_stats(sender, instance, created, **kwargs):
+    if created:
+        AuthorStats.objects.create(author=instance)
+
+
+@receiver(post_save, sender=Article)
+def create_article_stats(sender, instance, created, **kwargs):
+    if created:
+        ArticleStats.objects.create(article=instance)
+
+
+@receiver(m2m_changed, sender=Article.authors.through)
+def track_article_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_article_count = instance.article_set.count()
+        else:
+            instance._cleared_author_ids = list(instance.authors.values_list('pk', flat=True))
+        return
+
+    if action == 'post_clear':
+        if reverse:
+            AuthorStats.objects.adjust([instance.pk], 'article_count', -instance._cleared_article_count)
+        else:
+            AuthorStats.objects.adjust(instance._cleared_author_ids, 'article_count', -1)
+        return
+
+    if action == 'pre_remove':
+        # pk_set holds whatever the caller passed to remove(), including rows that are not linked.
+        linked = instance.article_set if reverse else instance.authors
+        instance._removed_pks = set(linked.filter(pk__in=pk_set).values_list('pk', flat=True))
+        return
+
+    if action == 'post_remove':
+        pk_set = instance._removed_pks
+
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    sign = 1 if action == 'post_add' else -1
+    if reverse:
+        AuthorStats.objects.adjust([instance.pk], 'article_count', sign * len(pk_set))
+    else:
+        AuthorStats.objects.adjust(pk_set, 'article_count', sign)
+
+
+@receiver(pre_delete, sender=Article)
+def remember_article_authors(sender, instance, **kwargs):
+    instance._deleted_author_ids = list(instance.authors.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Article)
+def release_article_authors(sender, instance, **kwargs):
+    AuthorStats.objects.adjust(instance._deleted_author_ids, 'article_count', -1)
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_review(sender, instance, raw, **kwargs):
+    instance._previous = None
+    if not raw and not instance._state.adding:
+        instance._previous = Review.objects \
+            .filter(pk=instance.pk) \
+            .values('author_id', 'article_id', 'rating') \
+            .first()
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, raw, **kwargs):
+    # Fixtures (loaddata) save raw and carry the stats rows as they were dumped.
+    if raw:
+        return
+
+    if created:
+        AuthorStats.objects.adjust([instance.author_id], 'review_count', 1)
+        ArticleStats.objects.apply(instance.article_id, 1, instance.rating)
+        return
+
+    previous = instance._previous
+    if previous is None:
+        return
+
+    if previous['author_id'] != instance.author_id:
+        AuthorStats.objects.adjust([previous['author_id']], 'review_count', -1)
+        AuthorStats.objects.adjust([instance.author_id], 'review_count', 1)
+
+    if previous['article_id'] != instance.article_id:
+        ArticleStats.objects.apply(previous['article_id'], -1, -previous['rating'])
+        ArticleStats.objects.apply(instance.article_id, 1, instance.rating)
+    elif previous['rating'] != instance.rating:
+        ArticleStats.objects.apply(instance.article_id, 0, instance.rating - previous['rating'])
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    AuthorStats.objects.adjust([instance.author_id], 'review_count', -1)
+    ArticleStats.objects.apply(instance.article_id, -1, -instance.rating)
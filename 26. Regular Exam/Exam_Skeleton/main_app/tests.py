@@ -1,3 +1,112 @@
+from django.core import serializers
 from django.test import TestCase
 
-# Create your tests here.
+from caller import get_latest_article, get_top_publisher
+from main_app.models import Article, ArticleStats, Author, AuthorStats, Review
+
+
+class StatsCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = Author.objects.create(full_name='First Author', email='first@example.com', birth_year=1980)
+        cls.second = Author.objects.create(full_name='Second Author', email='second@example.com', birth_year=1990)
+        cls.article = Article.objects.create(title='First article', content='Content of the first article.')
+        cls.other = Article.objects.create(title='Other article', content='Content of the other article.')
+
+    def article_counts(self):
+        return list(AuthorStats.objects.order_by('author_id').values_list('article_count', flat=True))
+
+    def test_article_counts_follow_the_authors_relation(self):
+        self.article.authors.add(self.first, self.second)
+        self.second.article_set.add(self.other)
+        self.assertEqual(self.article_counts(), [1, 2])
+
+        self.article.authors.remove(self.second)
+        self.first.article_set.clear()
+        self.assertEqual(self.article_counts(), [0, 1])
+
+        self.other.authors.clear()
+        self.assertEqual(self.article_counts(), [0, 0])
+
+    def test_removing_authors_that_are_not_linked_changes_nothing(self):
+        self.article.authors.add(self.first)
+
+        self.other.authors.remove(self.first)
+        self.second.article_set.remove(self.article)
+        self.assertEqual(self.article_counts(), [1, 0])
+        self.assertEqual(get_top_publisher(), 'Top Author: First Author with 1 published articles.')
+
+        self.article.authors.remove(self.first)
+        self.article.authors.remove(self.first)
+        self.assertEqual(self.article_counts(), [0, 0])
+
+    def test_deleting_an_article_releases_its_authors(self):
+        self.article.authors.add(self.first, self.second)
+        self.article.delete()
+
+        self.assertEqual(self.article_counts(), [0, 0])
+
+    def test_review_counts_and_average_rating(self):
+        review = Review.objects.create(content='A detailed review.', rating=4, author=self.first, article=self.article)
+        Review.objects.create(content='Another detailed review.', rating=2, author=self.second, article=self.article)
+
+        review.rating = 5
+        review.author = self.second
+        review.save()
+
+        stats = ArticleStats.objects.get(article=self.article)
+        self.assertEqual((stats.review_count, stats.rating_sum, stats.avg_rating), (2, 7.0, 3.5))
+        self.assertEqual(list(AuthorStats.objects.order_by('author_id').values_list('review_count', flat=True)),
+                         [0, 2])
+
+        review.article = self.other
+        review.save()
+        review.delete()
+
+        stats = ArticleStats.objects.get(article=self.article)
+        self.assertEqual((stats.review_count, stats.avg_rating), (1, 2.0))
+        self.assertEqual(ArticleStats.objects.get(article=self.other).review_count, 0)
+        self.assertEqual(list(AuthorStats.objects.order_by('author_id').values_list('review_count', flat=True)),
+                         [0, 1])
+
+    def test_reloading_a_fixture_keeps_the_review_stats(self):
+        Review.objects.create(content='A detailed review.', rating=4, author=self.first, article=self.article)
+        fixture = serializers.serialize('json', Review.objects.all())
+
+        # What loaddata does: the rows are saved raw, over the existing ones.
+        for deserialized in serializers.deserialize('json', fixture):
+            deserialized.save()
+
+        stats = ArticleStats.objects.get(article=self.article)
+        self.assertEqual((stats.review_count, stats.rating_sum), (1, 4.0))
+        self.assertEqual(AuthorStats.objects.get(author=self.first).review_count, 1)
+
+
+class LatestArticleTests(TestCase):
+    def test_article_without_stats_counts_as_unreviewed(self):
+        author = Author.objects.create(full_name='Only Author', email='only@example.com', birth_year=1980)
+        article = Article.objects.create(title='Latest article', content='Content of the latest article.')
+        article.authors.add(author)
+        ArticleStats.objects.filter(article=article).delete()
+
+        self.assertEqual(get_latest_article(), 'The latest article is: Latest article. Authors: Only Author. '
+                                               'Reviewed: 0 times. Average Rating: 0.00.')
+
+
+class BulkIngestTests(TestCase):
+    def test_article_ids_given_as_strings_are_matched(self):
+        author = Author.objects.create(full_name='Reviewer', email='reviewer@example.com', birth_year=1980)
+        article = Article.objects.create(title='Reviewed article', content='Content of the reviewed article.')
+
+        result = Review.objects.bulk_ingest([
+            {'author_email': author.email, 'article_id': str(article.pk), 'content': 'A detailed review.', 'rating': 4},
+            {'author_email': author.email, 'article_id': article.pk, 'content': 'Another detailed review.', 'rating': 2},
+            {'author_email': author.email, 'article_id': 'abc', 'content': 'A detailed review.', 'rating': 4},
+            {'author_email': author.email, 'article_id': str(article.pk + 1), 'content': 'A detailed review.', 'rating': 4},
+        ])
+
+        self.assertEqual((result['processed'], result['created']), (4, 2))
+        self.assertEqual(result['errors'], [(2, {'article_id': ['Unknown article.']}),
+                                            (3, {'article_id': ['Unknown article.']})])
+        stats = ArticleStats.objects.get(article=article)
+        self.assertEqual((stats.review_count, stats.avg_rating), (2, 3.0))
@@ -38,9 +38,11 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'main_app',
+    'query_inspector',
 ]
 
 MIDDLEWARE = [
+    'query_inspector.middleware.QueryInspectorMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -86,6 +88,32 @@ DATABASES = {
     }
 }
 
+# Query instrumentation
+# Reports are logged as JSON lines and, when JSON_PATH is set, appended to that file.
+
+QUERY_INSPECTOR = {
+    'PATH_PREFIXES': ['/admin/'],
+    'JSON_PATH': None,
+    'SLOWEST': 5,
+    'DUPLICATE_THRESHOLD': 2,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'query_inspector': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
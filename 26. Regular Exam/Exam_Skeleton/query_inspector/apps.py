@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+# Part of this project only, like main_app: another orm_skeleton project gets it by copying this
+# package next to its main_app and adding the app, middleware and QUERY_INSPECTOR settings.
+class QueryInspectorConfig(AppConfig):
+    name = 'query_inspector'
+    verbose_name = 'Query inspector'
@@ -0,0 +1,18 @@
+from query_inspector.recorder import inspect_queries
+from query_inspector.sinks import inspector_setting
+
+
+class QueryInspectorMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.path_prefixes = tuple(inspector_setting('PATH_PREFIXES', ('/admin/',)))
+
+    def __call__(self, request):
+        if not request.path.startswith(self.path_prefixes):
+            return self.get_response(request)
+
+        with inspect_queries(f'{request.method} {request.path}') as recorder:
+            response = self.get_response(request)
+
+        response['X-Query-Count'] = str(len(recorder.queries))
+        return response
@@ -0,0 +1,79 @@
+import time
+from collections import Counter
+from contextlib import ExitStack
+from functools import wraps
+
+from django.db import connections
+from django.utils import timezone
+
+from query_inspector.sinks import emit, inspector_setting
+
+
+class QueryRecorder:
+    def __init__(self, label: str):
+        self.label = label
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((context['connection'].alias, sql, time.perf_counter() - started))
+
+    def report(self) -> dict:
+        duplicate_threshold = inspector_setting('DUPLICATE_THRESHOLD', 2)
+        slowest = inspector_setting('SLOWEST', 5)
+
+        # Statements reach the wrapper with placeholders instead of values, so a repeated
+        # SQL string is the signature of the same query issued once per row (N+1).
+        signatures = Counter(sql for _, sql, _ in self.queries)
+
+        return {
+            'label': self.label,
+            'finished_at': timezone.now(),
+            'query_count': len(self.queries),
+            'db_time_ms': round(sum(duration for _, _, duration in self.queries) * 1000, 3),
+            'duplicates': [
+                {'sql': sql, 'count': count}
+                for sql, count in signatures.most_common()
+                if count >= duplicate_threshold
+            ],
+            'slowest': [
+                {'alias': alias, 'sql': sql, 'duration_ms': round(duration * 1000, 3)}
+                for alias, sql, duration in sorted(self.queries, key=lambda query: query[2], reverse=True)[:slowest]
+            ],
+        }
+
+
+class inspect_queries:
+    # Usable both as `with inspect_queries('label'):` and as a `@inspect_queries()` decorator.
+    def __init__(self, label=None, emit_report=True):
+        self.label = label
+        self.emit_report = emit_report
+
+    def __call__(self, function):
+        if self.label is None:
+            self.label = f'{function.__module__}.{function.__qualname__}'
+
+        @wraps(function)
+        def inner(*args, **kwargs):
+            with inspect_queries(self.label, self.emit_report):
+                return function(*args, **kwargs)
+
+        return inner
+
+    def __enter__(self) -> QueryRecorder:
+        self.recorder = QueryRecorder(self.label or 'queries')
+        self._wrappers = ExitStack()
+        for connection in connections.all():
+            self._wrappers.enter_context(connection.execute_wrapper(self.recorder))
+
+        return self.recorder
+
+    def __exit__(self, *exc_info):
+        self._wrappers.close()
+        if self.emit_report:
+            emit(self.recorder.report())
+
+        return False
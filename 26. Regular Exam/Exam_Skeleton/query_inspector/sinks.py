@@ -0,0 +1,21 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger('query_inspector')
+
+
+def inspector_setting(name, default):
+    return getattr(settings, 'QUERY_INSPECTOR', {}).get(name, default)
+
+
+def emit(report: dict):
+    line = json.dumps(report, cls=DjangoJSONEncoder)
+    logger.info(line)
+
+    json_path = inspector_setting('JSON_PATH', None)
+    if json_path:
+        with open(json_path, 'a', encoding='utf-8') as stream:
+            stream.write(line + '\n')
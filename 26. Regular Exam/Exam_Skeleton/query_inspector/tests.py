@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from main_app.models import Author
+from query_inspector.middleware import QueryInspectorMiddleware
+from query_inspector.recorder import inspect_queries
+
+
+@inspect_queries()
+def count_authors():
+    return Author.objects.count()
+
+
+class QueryRecorderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [Author.objects.create(full_name=f'Author {number}', email=f'author{number}@example.com',
+                                             birth_year=1980)
+                       for number in range(3)]
+
+    def test_repeated_statements_are_reported_as_duplicates(self):
+        with inspect_queries('authors', emit_report=False) as recorder:
+            for author in self.authors:
+                Author.objects.get(pk=author.pk)
+            Author.objects.count()
+
+        report = recorder.report()
+        self.assertEqual((report['label'], report['query_count']), ('authors', 4))
+        self.assertEqual(len(report['duplicates']), 1)
+        self.assertEqual(report['duplicates'][0]['count'], 3)
+        self.assertIn('WHERE', report['duplicates'][0]['sql'])
+        self.assertEqual(len(report['slowest']), 4)
+
+    @override_settings(QUERY_INSPECTOR={'DUPLICATE_THRESHOLD': 4, 'SLOWEST': 1})
+    def test_thresholds_come_from_the_settings(self):
+        with inspect_queries(emit_report=False) as recorder:
+            for author in self.authors:
+                Author.objects.get(pk=author.pk)
+
+        report = recorder.report()
+        self.assertEqual((report['label'], report['duplicates'], len(report['slowest'])), ('queries', [], 1))
+
+    def test_decorator_labels_reports_with_the_function_name(self):
+        with mock.patch('query_inspector.recorder.emit') as emit:
+            self.assertEqual(count_authors(), 3)
+
+        report, = emit.call_args.args
+        self.assertEqual((report['label'], report['query_count']), (f'{__name__}.count_authors', 1))
+
+    def test_reports_are_appended_to_the_json_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'queries.jsonl')
+            with override_settings(QUERY_INSPECTOR={'JSON_PATH': path}), self.assertLogs('query_inspector'):
+                count_authors()
+                count_authors()
+
+            with open(path, encoding='utf-8') as stream:
+                reports = [json.loads(line) for line in stream]
+
+        self.assertEqual([report['query_count'] for report in reports], [1, 1])
+
+
+class QueryInspectorMiddlewareTests(TestCase):
+    def view(self, request):
+        list(Author.objects.all())
+        list(Author.objects.all())
+        return HttpResponse()
+
+    @mock.patch('query_inspector.recorder.emit')
+    def test_admin_responses_carry_the_query_count(self, emit):
+        middleware = QueryInspectorMiddleware(self.view)
+
+        response = middleware(RequestFactory().get('/admin/main_app/author/'))
+
+        self.assertEqual(response['X-Query-Count'], '2')
+        self.assertEqual(emit.call_args.args[0]['label'], 'GET /admin/main_app/author/')
+        self.assertEqual(emit.call_args.args[0]['duplicates'][0]['count'], 2)
+
+    @mock.patch('query_inspector.recorder.emit')
+    def test_other_paths_are_not_inspected(self, emit):
+        response = QueryInspectorMiddleware(self.view)(RequestFactory().get('/articles/'))
+
+        self.assertNotIn('X-Query-Count', response)
+        emit.assert_not_called()